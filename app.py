@@ -6,7 +6,8 @@ from routes.auth_route import auth_bp
 from routes.user_route import user_bp
 from routes.home_route import home_bp
 from routes.debug_route import debug_bp
-from database.db import check_connection, get_connection
+from database.db import check_connection, get_connection, register_availability_check, register_instrumentation
+from database.session import register_session
 from models import  ensure_database_and_tables
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
@@ -21,6 +22,13 @@ app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', os.urandom(24))
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=7)
 
+# Query timing (registered first so its after_request hook also sees the final commit)
+register_instrumentation(app)
+# One database connection and transaction per request, shared by all models
+register_session(app)
+# Fast 503 while the database circuit breaker is open
+register_availability_check(app)
+
 
 # Set academic year based on current year
 current_year = datetime.now().year
@@ -7,9 +7,8 @@ class FiliereController:
 
     def list_filieres(self):
         try:
-            filiere = self.filiere_model.get_all_filieres()
-            print(filiere)
-            return filiere if filiere else []
+            filieres = self.filiere_model.get_all_filieres()
+            return filieres if filieres else []
         except Exception as e:
             return []
 
@@ -19,6 +18,12 @@ class FiliereController:
         except Exception as e:
             raise Exception(str(e))
 
+    def add_filieres(self, filieres):
+        try:
+            return self.filiere_model.add_filieres(filieres)
+        except Exception as e:
+            raise Exception(str(e))
+
     def get_filiere(self, filiere_id):
         try:
             return self.filiere_model.get_filiere(filiere_id)
@@ -1,22 +1,36 @@
 # controllers/home_controller.py
-from models import Student, Filiere, Room
+from models.dashboard import Dashboard
+
+
+def _count(row, key):
+    # MySQL returns SUM() as Decimal
+    return int(row.get(key) or 0)
+
 
 class HomeController:
     def get_dashboard_stats(self):
         print('HomeController.get_dashboard_stats called')
-        total_students = Student().get_all_students()
-        total_filieres = Filiere().get_all_filieres()
-        total_rooms = Room().get_all_rooms()
-        occupied_rooms = len([room for room in total_rooms if room['is_used']])
-        available_rooms = len([room for room in total_rooms if not room['is_used']])
-        iav_students = len([student for student in total_students if student['type_section'] == 'IAV'])
-        apesa_students = len([student for student in total_students if student['type_section'] == 'APESA'])
+        totals, pavilions, filieres = Dashboard().get_stats()
+        totals = totals or {}
+        total_students = _count(totals, 'students')
+        total_rooms = _count(totals, 'rooms')
+        occupied_rooms = _count(totals, 'occupied_rooms')
+        by_filiere = [{'name': row['label'], 'students': _count(row, 'students'),
+                       'iav_students': _count(row, 'iav_students'),
+                       'apesa_students': _count(row, 'apesa_students')} for row in filieres]
         return {
-            'total_students': len(total_students),
-            'total_filieres': len(total_filieres),
-            'total_rooms': len(total_rooms),
+            'total_students': total_students,
+            'total_filieres': _count(totals, 'filieres'),
+            'total_rooms': total_rooms,
             'occupied_rooms': occupied_rooms,
-            'available_rooms': available_rooms,
-            'iav_students': iav_students,
-            'apesa_students': apesa_students
+            'available_rooms': total_rooms - occupied_rooms,
+            'iav_students': _count(totals, 'iav_students'),
+            'apesa_students': _count(totals, 'apesa_students'),
+            'total_capacity': _count(totals, 'capacity'),
+            'by_pavilion': [{'pavilion': row['label'], 'rooms': _count(row, 'rooms'),
+                             'occupied_rooms': _count(row, 'occupied_rooms'),
+                             'capacity': _count(row, 'capacity'),
+                             'students': _count(row, 'students')} for row in pavilions],
+            'by_filiere': by_filiere,
+            'students_without_filiere': total_students - sum(row['students'] for row in by_filiere)
         }
@@ -5,9 +5,15 @@ class RoomController:
     def __init__(self):
         self.room_model = Room()
 
-    def list_rooms(self):
+    def list_rooms(self, projection='full'):
         try:
-            return self.room_model.get_all_rooms()
+            return self.room_model.get_all_rooms(projection)
+        except Exception as e:
+            raise Exception(str(e))
+
+    def list_room_metadata(self):
+        try:
+            return self.room_model.get_room_metadata()
         except Exception as e:
             raise Exception(str(e))
 
@@ -23,6 +29,12 @@ class RoomController:
         except Exception as e:
             raise Exception(str(e))
 
+    def add_rooms(self, rooms):
+        try:
+            return self.room_model.add_rooms(rooms)
+        except Exception as e:
+            raise Exception(str(e))
+
     def update_room(self, room_id, data):
         try:
             return self.room_model.update_room(room_id, data)
@@ -5,59 +5,30 @@ class StudentController:
     def __init__(self):
         self.student_model = Student()
 
-    def list_students(self):
-        return self.student_model.get_all_students()
+    def list_students(self, projection='full'):
+        return self.student_model.get_all_students(projection)
 
-    def get_paginated_students(self, page=1, per_page=10, search='', filiere_id=None, internat='', pavilion=None, chambre=None):
+    def iter_students(self, batch_size=None, projection='full'):
+        return self.student_model.iter_students(batch_size=batch_size, projection=projection)
+
+    def get_paginated_students(self, page=1, per_page=10, search='', filiere_id=None, internat='', pavilion=None, chambre=None, sort=None):
         """
-        Get paginated students with optional filtering
+        Get paginated students with optional filtering (keyword matches best first unless sorted)
         Returns a tuple of (students, total_count)
         """
-        # Get all students first (we'll filter them in memory)
-        all_students = self.list_students()
-        filtered_students = all_students
+        page = max(page or 1, 1)
+        return self.student_model.get_students_page(
+            per_page, (page - 1) * per_page, projection='list', sort=sort,
+            keyword=search, filiere_id=filiere_id, type_section=internat, pavilion=pavilion, chambre=chambre)
 
-        if search:
-            search = search.lower()
-            filtered_students = [
-                s for s in filtered_students
-                if search in s.get('nom', '').lower() or
-                   search in s.get('prenom', '').lower() or
-                   search in s.get('matricule', '').lower() or
-                   search in s.get('cin', '').lower()
-            ]
-        if filiere_id:
-            filtered_students = [
-                s for s in filtered_students
-                if s.get('filiere_id') == filiere_id
-            ]
-        if internat:
-            if internat == 'aucun':
-                filtered_students = [
-                    s for s in filtered_students
-                    if not s.get('type_section')
-                ]
-            else:
-                filtered_students = [
-                    s for s in filtered_students
-                    if s.get('type_section') == internat
-                ]
-        if pavilion:
-            filtered_students = [
-                s for s in filtered_students
-                if s.get('pavilion') == pavilion
-            ]
-        if chambre:
-            filtered_students = [
-                s for s in filtered_students
-                if s.get('num_chambre') == chambre
-            ]
-        # Calculate pagination
-        total = len(filtered_students)
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-        paginated_students = filtered_students[start_idx:end_idx]
-        return paginated_students, total
+    def get_students_by_cursor(self, cursor=None, per_page=10, search='', filiere_id=None, internat='', pavilion=None, chambre=None, sort='recent'):
+        """
+        Get the page of students after (or before) an opaque cursor, with the same filters
+        Returns a tuple of (students, next_cursor, prev_cursor); raises ValueError for an invalid cursor
+        """
+        return self.student_model.get_students_keyset(
+            per_page, cursor, projection='list', sort=sort,
+            keyword=search, filiere_id=filiere_id, type_section=internat, pavilion=pavilion, chambre=chambre)
 
     def add_student(self, data, files=None):
         data_dict = dict(data)
@@ -85,6 +56,10 @@ class StudentController:
             return {'error': 'Add failed'}
         return {'student_id': result}
 
+    def import_students(self, rows):
+        """Bulk insert imported rows; returns one outcome per row"""
+        return self.student_model.create_students([dict(row) for row in rows])
+
     def get_student(self, student_id):
         return self.student_model.get_student_by_id(student_id)
 
@@ -131,7 +106,8 @@ class StudentController:
                 print('[ERROR] StudentController.update_student: Photo upload failed')
                 return {'error': result.get('error', 'Photo upload failed')}
                 
-        result = self.student_model.update_student(student_id, data_dict)
+        # The model compares against the row loaded above instead of reading it again
+        result = self.student_model.update_student(student_id, data_dict, existing=existing_student)
         if result is False:
             return {'error': 'Update failed'}
         return {'status': 'success'}
@@ -146,27 +122,12 @@ class StudentController:
         return self.student_model.search_students(keyword, chambre)
 
     def get_filtered_students(self, type_section='', keyword='', chambre=''):
+        """
+        Stream the students matching the filters, as rows ready for display
+        ('Aucune' as room and pavilion for students without a room)
+        """
         print('StudentController.get_filtered_students called')
-        students = self.list_students()
-        # Filter by type_section if set
-        if type_section:
-            students = [s for s in students if s.get('type_section') == type_section]
-        # Filter by keyword if set
-        if keyword:
-            students = [s for s in students if keyword.lower() in (s.get('nom','').lower() + s.get('prenom','').lower() + s.get('matricule','').lower())]
-        # Filter by chambre if set
-        if chambre:
-            students = [s for s in students if (s.get('num_chambre') == chambre) or (chambre == 'Aucune' and (s.get('num_chambre') in [None, '', 'no room']))]
-        # Mark 'Aucune' for students with no room for display, and add pavillon
-        from controllers.room_controller import RoomController
-        rooms = RoomController().list_rooms()
-        for s in students:
-            if s.get('num_chambre') in [None, '', 'no room']:
-                s['num_chambre'] = 'Aucune'
-                s['pavilion'] = 'Aucune'
-            else:
-                room = next((r for r in rooms if r.get('room_number') == s['num_chambre']), None)
-                s['pavilion'] = room['pavilion'] if room else ''
-        return students
+        return self.student_model.iter_students(projection='display', type_section=type_section,
+                                                keyword=keyword, chambre=chambre)
 
 
@@ -0,0 +1,116 @@
+# database/benchmark_drivers.py
+"""Micro-benchmark of row decoding throughput for the available MySQL drivers.
+
+Runs the get_all_students query (students joined with filieres and rooms)
+through each installed driver with a dict cursor and reports the best and
+median time per pass. The server does the same work for every driver, so the
+differences come from protocol parsing and row decoding on the client.
+
+Usage:
+    python -m database.benchmark_drivers [--repeat 10] [--copies 100]
+
+--copies multiplies the student rows with a cross join so a small database
+still produces a result set large enough to measure.
+"""
+import argparse
+import statistics
+import time
+
+from database.db import MYSQL_DATABASE, MYSQL_HOST, MYSQL_PASSWORD, MYSQL_USER, is_sqlite
+
+STUDENTS_QUERY = """
+    SELECT s.*, f.name as filiere_name, r.pavilion
+    FROM students s
+    LEFT JOIN filieres f ON f.id = s.filiere_id
+    LEFT JOIN rooms r ON r.id = s.room_id
+    {copies}
+    ORDER BY s.created_at DESC
+"""
+
+
+def _pymysql():
+    import pymysql
+    from pymysql.cursors import DictCursor
+    conn = pymysql.connect(host=MYSQL_HOST, user=MYSQL_USER, password=MYSQL_PASSWORD,
+                           database=MYSQL_DATABASE, charset='utf8mb4')
+    return conn, lambda: conn.cursor(DictCursor)
+
+
+def _mysqlclient():
+    import MySQLdb
+    import MySQLdb.cursors
+    conn = MySQLdb.connect(host=MYSQL_HOST, user=MYSQL_USER, password=MYSQL_PASSWORD,
+                           database=MYSQL_DATABASE, charset='utf8mb4')
+    return conn, lambda: conn.cursor(MySQLdb.cursors.DictCursor)
+
+
+def _mysql_connector():
+    import mysql.connector
+    conn = mysql.connector.connect(host=MYSQL_HOST, user=MYSQL_USER, password=MYSQL_PASSWORD,
+                                   database=MYSQL_DATABASE, charset='utf8mb4')
+    return conn, lambda: conn.cursor(dictionary=True)
+
+
+DRIVERS = [
+    ('pymysql', _pymysql),
+    ('mysqlclient', _mysqlclient),
+    ('mysql-connector', _mysql_connector),
+]
+
+
+def build_query(copies):
+    if copies <= 1:
+        return STUDENTS_QUERY.format(copies='')
+    numbers = ' UNION ALL '.join(f'SELECT {n}' for n in range(copies))
+    return STUDENTS_QUERY.format(copies=f'CROSS JOIN ({numbers}) AS copies')
+
+
+def run(opener, query, repeat):
+    """Return (rows, [seconds per pass]) or None if the driver is not installed"""
+    try:
+        conn, new_cursor = opener()
+    except ImportError:
+        return None
+    try:
+        timings = []
+        rows = 0
+        # The first, untimed pass warms the server's buffer pool
+        for i in range(repeat + 1):
+            cursor = new_cursor()
+            start = time.perf_counter()
+            cursor.execute(query)
+            rows = len(cursor.fetchall())
+            elapsed = time.perf_counter() - start
+            cursor.close()
+            if i:
+                timings.append(elapsed)
+        return rows, timings
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare row decoding throughput of MySQL drivers')
+    parser.add_argument('--repeat', type=int, default=10, help='Timed passes per driver')
+    parser.add_argument('--copies', type=int, default=1, help='Multiply the student rows with a cross join')
+    args = parser.parse_args(argv)
+
+    if is_sqlite():
+        parser.error('DB_BACKEND=sqlite: the driver benchmark needs a MySQL server')
+
+    query = build_query(args.copies)
+    print(f"{'driver':<16} {'rows':>8} {'best ms':>10} {'median ms':>10} {'rows/s':>12}")
+    for driver_name, opener in DRIVERS:
+        result = run(opener, query, max(1, args.repeat))
+        if result is None:
+            print(f"{driver_name:<16} not installed")
+            continue
+        rows, timings = result
+        best = min(timings)
+        median = statistics.median(timings)
+        rate = rows / median if median else 0
+        print(f"{driver_name:<16} {rows:>8} {best * 1000:>10.1f} {median * 1000:>10.1f} {rate:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
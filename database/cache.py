@@ -0,0 +1,171 @@
+# database/cache.py
+"""Read-through cache for query results.
+
+Entries are keyed by (query, params), bounded in size (LRU) and age (TTL).
+Every cached read declares the tables it depends on. Writes bump a
+per-table version when their transaction commits (see DbSession), and an
+entry is only served while none of its tables was bumped after the point
+its rows were read.
+
+Versions are per process: with several worker processes a write made in one
+worker only reaches the others' caches once their entries expire, so keep
+DB_CACHE_TTL short.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from database.db import DB_CACHE_ENABLED, DB_CACHE_SIZE, DB_CACHE_TTL
+
+
+class QueryCache:
+    """Thread-safe LRU + TTL map of query results with table-version invalidation"""
+
+    def __init__(self, max_size=DB_CACHE_SIZE, ttl=DB_CACHE_TTL):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (expires_at, generation, tables, rows)
+        self._entries = OrderedDict()
+        # Every invalidation advances the generation; each table remembers the last one that touched it
+        self._generation = 0
+        self._versions = {}
+        # Generation of the last invalidate() without tables, which outdates every table
+        self._reset_generation = 0
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'expired': 0, 'evictions': 0, 'invalidations': 0}
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @staticmethod
+    def make_key(query, params):
+        if isinstance(params, list):
+            params = tuple(params)
+        key = (query, params)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key):
+        """Return (True, rows) on a valid hit, (False, None) otherwise"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return False, None
+            expires_at, generation, tables, rows = entry
+            if now >= expires_at:
+                del self._entries[key]
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return False, None
+            if self._outdated(tables, generation):
+                del self._entries[key]
+                self._stats['stale'] += 1
+                self._stats['misses'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return True, rows
+
+    def put(self, key, rows, tables, generation):
+        """Store rows read at `generation`; ignored if a table changed or the cache was reset since then"""
+        with self._lock:
+            if self._outdated(tables, generation):
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, generation, tuple(tables), rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, *tables):
+        """Bump the version of `tables`; with no argument drop every entry"""
+        with self._lock:
+            self._generation += 1
+            self._stats['invalidations'] += 1
+            if not tables:
+                self._entries.clear()
+                self._reset_generation = self._generation
+                return
+            for table in tables:
+                self._versions[table] = self._generation
+
+    def changed_since(self, tables, generation):
+        """True if any of `tables` was invalidated after `generation`"""
+        with self._lock:
+            return self._outdated(tables, generation)
+
+    def _outdated(self, tables, generation):
+        # Caller holds _lock
+        return (self._reset_generation > generation
+                or any(self._versions.get(table, 0) > generation for table in tables))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+            stats['max_size'] = self.max_size
+            stats['ttl'] = self.ttl
+            stats['enabled'] = DB_CACHE_ENABLED
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+query_cache = QueryCache()
+
+
+def _copy_rows(rows):
+    # Callers are free to mutate what they get back, so never hand out the cached objects;
+    # records and other tuples are immutable and are shared as they are
+    if rows is None:
+        return None
+    if isinstance(rows, dict):
+        return dict(rows)
+    return [dict(row) if isinstance(row, dict) else row for row in rows]
+
+
+def cached_query(cursor, query, params=None, tables=(), one=False, generation=None, row_factory=None):
+    """Run a SELECT through the cache.
+
+    `tables` lists every table the result depends on. `generation` is the
+    cache generation observed when the reading transaction started; it
+    defaults to the current one, which is right for a fresh transaction.
+    `row_factory` converts each fetched row before it is cached and returned.
+    """
+    key = query_cache.make_key(query, params) if DB_CACHE_ENABLED else None
+    if key is not None:
+        key = key + (one,)
+        hit, rows = query_cache.get(key)
+        if hit:
+            return _copy_rows(rows)
+    if generation is None:
+        generation = query_cache.generation
+    if params is None:
+        cursor.execute(query)
+    else:
+        cursor.execute(query, params)
+    rows = cursor.fetchone() if one else cursor.fetchall()
+    if row_factory is not None:
+        rows = (row_factory(rows) if rows is not None else None) if one else [row_factory(row) for row in rows]
+    if key is not None:
+        query_cache.put(key, rows, tables, generation)
+        return _copy_rows(rows)
+    return rows
+
+
+def invalidate_tables(*tables):
+    query_cache.invalidate(*tables)
+
+
+def get_cache_stats():
+    return query_cache.stats()
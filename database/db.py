@@ -2,8 +2,13 @@
 import os
 from dotenv import load_dotenv
 import pymysql
-from pymysql.cursors import DictCursor
+from pymysql.cursors import Cursor, DictCursor, SSCursor, SSDictCursor
+import random
+import re
+import threading
 import time
+from collections import deque
+from flask import g, has_request_context, request
 
 load_dotenv()
 
@@ -12,55 +17,607 @@ MYSQL_USER = os.environ.get('MYSQL_USER', 'root')
 MYSQL_PASSWORD = os.environ.get('MYSQL_PASSWORD', '')
 MYSQL_DATABASE = os.environ.get('MYSQL_DATABASE') or os.environ.get('MYSQL_DB') or os.environ.get('MYSQL_NAME', 'internat')
 
-def get_connection(use_db=True, max_retries=10, retry_delay=1):
-    """Get a connection to the MySQL database with retry logic"""
-    retries = 0
-    last_error = None
-    
-    while retries < max_retries:
+# Storage backend: 'mysql' (default) or 'sqlite' for an embedded file / in-memory database
+DB_BACKEND = os.environ.get('DB_BACKEND', 'mysql').lower()
+SQLITE_PATH = os.environ.get('SQLITE_PATH', ':memory:')
+# MySQL driver: 'pymysql' (pure Python, default) or 'mysqlclient' (C extension, faster row decoding)
+DB_DRIVER = os.environ.get('DB_DRIVER', 'pymysql').lower()
+
+# Connection pool configuration
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', 1))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 10))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = float(os.environ.get('DB_POOL_RECYCLE', 3600))
+DB_POOL_IDLE_TIMEOUT = float(os.environ.get('DB_POOL_IDLE_TIMEOUT', 300))
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1').lower() in ('1', 'true', 'yes', 'on')
+
+# Rows per multi-row INSERT / executemany batch
+DB_BULK_BATCH_SIZE = int(os.environ.get('DB_BULK_BATCH_SIZE', 500))
+
+# Rows fetched per round-trip by streaming (unbuffered) reads
+DB_STREAM_BATCH_SIZE = int(os.environ.get('DB_STREAM_BATCH_SIZE', 1000))
+
+# Query instrumentation
+DB_INSTRUMENTATION = os.environ.get('DB_INSTRUMENTATION', '1').lower() in ('1', 'true', 'yes', 'on')
+DB_SLOW_QUERY_MS = float(os.environ.get('DB_SLOW_QUERY_MS', 200))
+DB_QUERY_STATS_MAX = int(os.environ.get('DB_QUERY_STATS_MAX', 500))
+DB_REPEATED_QUERY_WARN = int(os.environ.get('DB_REPEATED_QUERY_WARN', 10))
+
+# Query result cache (entries, seconds)
+DB_CACHE_ENABLED = os.environ.get('DB_CACHE_ENABLED', '1').lower() in ('1', 'true', 'yes', 'on')
+DB_CACHE_SIZE = int(os.environ.get('DB_CACHE_SIZE', 256))
+DB_CACHE_TTL = float(os.environ.get('DB_CACHE_TTL', 30))
+# Reference data (filieres, room metadata) snapshots; writes in this process invalidate them at once
+DB_REFERENCE_TTL = float(os.environ.get('DB_REFERENCE_TTL', 300))
+# Opt-in in-process NumPy index of the student list facets (needs numpy); rebuilt at least every TTL seconds
+DB_STUDENT_INDEX_ENABLED = os.environ.get('DB_STUDENT_INDEX_ENABLED', '0').lower() in ('1', 'true', 'yes', 'on')
+DB_STUDENT_INDEX_TTL = float(os.environ.get('DB_STUDENT_INDEX_TTL', 30))
+
+# Connection retries: exponential backoff with full jitter, bounded by a total deadline
+DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', 5))
+DB_CONNECT_RETRIES = int(os.environ.get('DB_CONNECT_RETRIES', 5))
+DB_RETRY_BASE_DELAY = float(os.environ.get('DB_RETRY_BASE_DELAY', 0.1))
+DB_RETRY_MAX_DELAY = float(os.environ.get('DB_RETRY_MAX_DELAY', 2))
+DB_RETRY_DEADLINE = float(os.environ.get('DB_RETRY_DEADLINE', 5))
+
+# Circuit breaker: open after N consecutive connection failures, probe again after the reset timeout
+DB_BREAKER_THRESHOLD = int(os.environ.get('DB_BREAKER_THRESHOLD', 3))
+DB_BREAKER_RESET_TIMEOUT = float(os.environ.get('DB_BREAKER_RESET_TIMEOUT', 10))
+
+
+_FINGERPRINT_RULES = [
+    (re.compile(r"'(?:[^'\\]|\\.|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\s+'), ' '),
+    (re.compile(r'(\(\?(?:, ?\?)*\))(?:, ?\(\?(?:, ?\?)*\))+'), r'\1, ...'),
+    (re.compile(r'IN \(\?(?:, ?\?)+\)', re.IGNORECASE), 'IN (?, ...)'),
+]
+
+def fingerprint(query):
+    """Normalise a statement so that calls differing only by literals share a key"""
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    for pattern, replacement in _FINGERPRINT_RULES:
+        query = pattern.sub(replacement, query)
+    return query.strip()
+
+
+_query_stats = {}
+_query_stats_lock = threading.Lock()
+
+def record_query(query, duration, rows):
+    """Account one statement in the process-wide and per-request statistics"""
+    key = fingerprint(query)
+    route = None
+    if has_request_context():
+        route = request.endpoint
+        stats = g.get('db_stats')
+        if stats is None:
+            stats = g.db_stats = {'count': 0, 'time': 0.0, 'rows': 0, 'queries': {}}
+        stats['count'] += 1
+        stats['time'] += duration
+        stats['rows'] += rows or 0
+        stats['queries'][key] = stats['queries'].get(key, 0) + 1
+
+    with _query_stats_lock:
+        entry = _query_stats.get(key)
+        if entry is None and len(_query_stats) < DB_QUERY_STATS_MAX:
+            entry = _query_stats[key] = {'count': 0, 'total_time': 0.0, 'max_time': 0.0, 'rows': 0, 'routes': set()}
+        if entry is not None:
+            entry['count'] += 1
+            entry['total_time'] += duration
+            entry['max_time'] = max(entry['max_time'], duration)
+            entry['rows'] += rows or 0
+            if route:
+                entry['routes'].add(route)
+
+    if duration * 1000 >= DB_SLOW_QUERY_MS:
+        print(f"[SLOW QUERY] {duration * 1000:.1f} ms, rows={rows}, route={route}: {key}")
+
+def get_query_stats(limit=20):
+    """Top statement fingerprints by total time"""
+    with _query_stats_lock:
+        items = [(key, dict(entry, routes=sorted(entry['routes']))) for key, entry in _query_stats.items()]
+    items.sort(key=lambda item: item[1]['total_time'], reverse=True)
+    return [dict(entry, query=key, avg_time=entry['total_time'] / entry['count']) for key, entry in items[:limit]]
+
+
+class InstrumentedCursorMixin:
+    """Times every statement and reports it to record_query()"""
+
+    def execute(self, query, args=None):
+        if not DB_INSTRUMENTATION:
+            return super().execute(query, args)
+        start = time.perf_counter()
         try:
+            return super().execute(query, args)
+        finally:
+            rows = self.rowcount if self.rowcount is not None and 0 <= self.rowcount < 2 ** 63 else None
+            record_query(query, time.perf_counter() - start, rows)
+
+
+class InstrumentedCursor(InstrumentedCursorMixin, Cursor):
+    pass
+
+
+class InstrumentedDictCursor(InstrumentedCursorMixin, DictCursor):
+    pass
+
+
+class InstrumentedSSCursor(InstrumentedCursorMixin, SSCursor):
+    pass
+
+
+class InstrumentedSSDictCursor(InstrumentedCursorMixin, SSDictCursor):
+    pass
+
+
+def register_instrumentation(app):
+    """Expose per-request database totals in a Server-Timing response header"""
+
+    @app.after_request
+    def add_server_timing(response):
+        stats = g.get('db_stats')
+        if stats is not None:
+            # The same statement issued many times in one request is usually an N+1 pattern
+            for key, count in stats['queries'].items():
+                if count >= DB_REPEATED_QUERY_WARN:
+                    print(f"[REPEATED QUERY] {request.endpoint} ran {count}x: {key}")
+            response.headers.add(
+                'Server-Timing',
+                f'db;dur={stats["time"] * 1000:.1f};desc="{stats["count"]} queries, {stats["rows"]} rows"')
+        return response
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available before the checkout timeout"""
+
+
+class DatabaseUnavailableError(pymysql.err.OperationalError):
+    """Raised without touching the network while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Process-wide breaker in front of connection attempts.
+
+    closed: connections are attempted normally. After `threshold` consecutive
+    failures the breaker opens and every caller fails immediately. Once
+    `reset_timeout` has elapsed a single caller is let through as a probe
+    (half-open); its success closes the breaker, its failure re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, threshold=DB_BREAKER_THRESHOLD, reset_timeout=DB_BREAKER_RESET_TIMEOUT):
+        self.threshold = max(1, threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._last_error = None
+        self._stats = {'opened': 0, 'rejected': 0, 'probes': 0}
+
+    def retry_after(self):
+        """Seconds until the next probe is allowed, 0 when calls may go through"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0
+            return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def before_call(self):
+        """Let the call through, or raise DatabaseUnavailableError without connecting.
+
+        Returns True when the caller is the half-open probe.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return False
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._stats['probes'] += 1
+                return True
+            self._stats['rejected'] += 1
+            raise DatabaseUnavailableError(2003, f"Database unavailable (circuit open): {self._last_error}")
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                print("[DB] Circuit breaker closed, database reachable again")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self, error):
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error)
+            if self._state == self.HALF_OPEN or self._failures >= self.threshold:
+                if self._state != self.OPEN:
+                    self._stats['opened'] += 1
+                    print(f"[DB] Circuit breaker open for {self.reset_timeout}s after {self._failures} failures: {error}")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'last_error': self._last_error,
+            })
+        stats['retry_after'] = round(self.retry_after(), 3)
+        return stats
+
+
+breaker = CircuitBreaker()
+
+def get_breaker_stats():
+    return breaker.stats()
+
+def _backoff_delay(attempt, base_delay):
+    """Full-jitter exponential backoff for the given (0-based) retry attempt"""
+    return random.uniform(0, min(DB_RETRY_MAX_DELAY, base_delay * (2 ** attempt)))
+
+def _is_transient(error):
+    # Connection-level failures are worth retrying; bad SQL or constraint violations are not
+    return (isinstance(error, (pymysql.err.OperationalError, pymysql.err.InterfaceError))
+            and not isinstance(error, DatabaseUnavailableError))
+
+def register_availability_check(app):
+    """Answer 503 straight away while the database is known to be down"""
+
+    def unavailable(retry_after):
+        response = app.make_response((
+            'La base de données est temporairement indisponible. Veuillez réessayer dans quelques instants.', 503))
+        response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+        return response
+
+    @app.before_request
+    def reject_when_breaker_open():
+        # Static files and the monitoring endpoint never need the database
+        if request.endpoint in ('static', 'debug.db_stats'):
+            return None
+        retry_after = breaker.retry_after()
+        if retry_after > 0:
+            return unavailable(retry_after)
+        return None
+
+    @app.errorhandler(DatabaseUnavailableError)
+    def database_unavailable(error):
+        return unavailable(breaker.retry_after() or DB_BREAKER_RESET_TIMEOUT)
+
+    @app.errorhandler(PoolTimeoutError)
+    def pool_exhausted(error):
+        return unavailable(1)
+
+
+def is_sqlite():
+    return DB_BACKEND == 'sqlite'
+
+_driver_connect = None
+
+def _get_driver_connect():
+    """Resolve the configured MySQL driver once; fall back to PyMySQL if mysqlclient is missing"""
+    global _driver_connect
+    if _driver_connect is None:
+        if DB_DRIVER == 'mysqlclient':
+            try:
+                from database.mysqlclient_backend import connect
+                _driver_connect = connect
+            except ImportError as e:
+                print(f"[WARNING] DB_DRIVER=mysqlclient but MySQLdb is not available ({e}), using PyMySQL")
+                _driver_connect = pymysql.connect
+        else:
+            _driver_connect = pymysql.connect
+    return _driver_connect
+
+def _connect(use_db=True, max_retries=None, retry_delay=None):
+    """Open a new connection with the configured driver, retrying with exponential backoff until the deadline.
+
+    Attempts go through the circuit breaker: while it is open this raises
+    DatabaseUnavailableError immediately instead of waiting on the network.
+    """
+    probe = breaker.before_call()
+    if is_sqlite():
+        from database.sqlite_backend import connect
+        try:
+            conn = connect(SQLITE_PATH, MYSQL_DATABASE, InstrumentedDictCursor)
+        except Exception as e:
+            breaker.record_failure(e)
+            raise
+        breaker.record_success()
+        return conn
+    # A half-open probe gets a single attempt so it cannot hold a request for the whole deadline
+    max_retries = 1 if probe else (DB_CONNECT_RETRIES if max_retries is None else max_retries)
+    retry_delay = DB_RETRY_BASE_DELAY if retry_delay is None else retry_delay
+    driver_connect = _get_driver_connect()
+    deadline = time.monotonic() + DB_RETRY_DEADLINE
+    attempt = 0
+
+    while True:
+        try:
+            params = dict(
+                host=MYSQL_HOST,
+                user=MYSQL_USER,
+                password=MYSQL_PASSWORD,
+                charset='utf8mb4',
+                cursorclass=InstrumentedDictCursor,
+                connect_timeout=DB_CONNECT_TIMEOUT,
+                read_timeout=30,
+                write_timeout=30
+            )
             if use_db:
-                conn = pymysql.connect(
-                    host=MYSQL_HOST,
-                    user=MYSQL_USER,
-                    password=MYSQL_PASSWORD,
-                    database=MYSQL_DATABASE,
-                    charset='utf8mb4',
-                    cursorclass=DictCursor,
-                    connect_timeout=10,
-                    read_timeout=30,
-                    write_timeout=30
-                )
-            else:
-                conn = pymysql.connect(
-                    host=MYSQL_HOST,
-                    user=MYSQL_USER,
-                    password=MYSQL_PASSWORD,
-                    charset='utf8mb4',
-                    cursorclass=DictCursor,
-                    connect_timeout=10,
-                    read_timeout=30,
-                    write_timeout=30
-                )
+                params['database'] = MYSQL_DATABASE
+            conn = driver_connect(**params)
+            breaker.record_success()
             return conn
         except pymysql.Error as e:
-            last_error = e
-            retries += 1
-            if retries < max_retries:
-                print(f"Connection attempt {retries} failed: {e}. Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
+            delay = _backoff_delay(attempt, retry_delay)
+            attempt += 1
+            if attempt >= max_retries or time.monotonic() + delay > deadline:
+                print(f"Failed to connect after {attempt} attempts. Last error: {e}")
+                breaker.record_failure(e)
+                raise
+            print(f"Connection attempt {attempt} failed: {e}. Retrying in {delay:.2f} seconds...")
+            time.sleep(delay)
+        except Exception as e:
+            # Not retried, but a failed half-open probe must still re-open the breaker
+            if probe:
+                breaker.record_failure(e)
+            raise
+
+
+class PooledConnection:
+    """Proxy around a pooled connection; close() hands it back to the pool"""
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get('_raw')
+        if raw is None:
+            raise pymysql.err.InterfaceError(0, 'Connection already returned to the pool')
+        return getattr(raw, name)
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._release(raw, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # Safety net for callers that forget to close
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of PyMySQL connections"""
+
+    def __init__(self, min_size=DB_POOL_MIN_SIZE, max_size=DB_POOL_MAX_SIZE, timeout=DB_POOL_TIMEOUT,
+                 recycle=DB_POOL_RECYCLE, idle_timeout=DB_POOL_IDLE_TIMEOUT, pre_ping=DB_POOL_PRE_PING):
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.idle_timeout = idle_timeout
+        self.pre_ping = pre_ping
+        self._pid = os.getpid()
+        self._cond = threading.Condition(threading.Lock())
+        # Each idle entry is (raw connection, created_at, last_used)
+        self._idle = deque()
+        self._in_use = 0
+        self._stats = {
+            'checkouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'ping_failures': 0,
+            'timeouts': 0,
+            'waits': 0,
+            'total_wait_time': 0.0,
+            'max_wait_time': 0.0,
+        }
+
+    def _open(self):
+        raw = _connect()
+        with self._cond:
+            self._stats['created'] += 1
+        return raw
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _is_stale(self, created_at, last_used, now):
+        if self.recycle and now - created_at > self.recycle:
+            return True
+        if self.idle_timeout and now - last_used > self.idle_timeout:
+            return True
+        return False
+
+    def _check_fork(self):
+        # Connections must never be shared between a gunicorn master and its workers
+        if self._pid != os.getpid():
+            with self._cond:
+                self._idle.clear()
+                self._in_use = 0
+                self._pid = os.getpid()
+
+    def warm_up(self):
+        """Open connections until min_size are idle"""
+        self._check_fork()
+        while True:
+            with self._cond:
+                if len(self._idle) + self._in_use >= self.min_size:
+                    return
+                self._in_use += 1
+            try:
+                raw = self._open()
+            except Exception:
+                with self._cond:
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+            now = time.monotonic()
+            with self._cond:
+                self._in_use -= 1
+                self._idle.append((raw, now, now))
+                self._cond.notify()
+
+    def acquire(self, timeout=None):
+        """Check out a connection, waiting up to `timeout` seconds when the pool is exhausted"""
+        self._check_fork()
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+        with self._cond:
+            while not self._idle and self._in_use >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {timeout}s "
+                        f"(pool max size: {self.max_size})")
+                waited = True
+                self._cond.wait(remaining)
+            entry = self._idle.pop() if self._idle else None
+            self._in_use += 1
+            wait_time = time.monotonic() - start
+            self._stats['checkouts'] += 1
+            if waited:
+                self._stats['waits'] += 1
+                self._stats['total_wait_time'] += wait_time
+                self._stats['max_wait_time'] = max(self._stats['max_wait_time'], wait_time)
+
+        try:
+            raw, created_at = self._prepare(entry)
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return PooledConnection(self, raw, created_at)
+
+    def _prepare(self, entry):
+        """Validate an idle entry, replacing it with a fresh connection when needed"""
+        now = time.monotonic()
+        if entry is not None:
+            raw, created_at, last_used = entry
+            if self._is_stale(created_at, last_used, now):
+                self._discard(raw)
+                with self._cond:
+                    self._stats['recycled'] += 1
+            elif self.pre_ping:
+                try:
+                    raw.ping(reconnect=False)
+                    return raw, created_at
+                except Exception as e:
+                    print(f"Pooled connection failed pre-ping: {e}. Reconnecting...")
+                    self._discard(raw)
+                    with self._cond:
+                        self._stats['ping_failures'] += 1
             else:
-                print(f"Failed to connect after {max_retries} attempts. Last error: {e}")
-                raise last_error
+                return raw, created_at
+        return self._open(), time.monotonic()
+
+    def _release(self, raw, created_at):
+        self._check_fork()
+        try:
+            # Never hand an open transaction to the next borrower
+            raw.rollback()
+            healthy = raw.open
+        except Exception:
+            healthy = False
+        now = time.monotonic()
+        with self._cond:
+            self._in_use = max(0, self._in_use - 1)
+            if healthy and not (self.recycle and now - created_at > self.recycle):
+                self._idle.append((raw, created_at, now))
+                raw = None
+            # Trim idle connections beyond min_size that have sat unused too long
+            while len(self._idle) > self.min_size and self.idle_timeout \
+                    and now - self._idle[0][2] > self.idle_timeout:
+                self._discard(self._idle.popleft()[0])
+                self._stats['recycled'] += 1
+            self._cond.notify()
+        if raw is not None:
+            self._discard(raw)
+
+    def close_all(self):
+        """Close every idle connection (in-use connections are closed on release)"""
+        with self._cond:
+            while self._idle:
+                self._discard(self._idle.popleft()[0])
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+            })
+        stats['avg_wait_time'] = stats['total_wait_time'] / stats['waits'] if stats['waits'] else 0.0
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = ConnectionPool()
+                pool.warm_up()
+                _pool = pool
+    return _pool
+
+def get_pool_stats():
+    """Pool usage counters (in-use, idle, wait times) for monitoring"""
+    if _pool is None:
+        return {'in_use': 0, 'idle': 0, 'min_size': DB_POOL_MIN_SIZE, 'max_size': DB_POOL_MAX_SIZE}
+    return _pool.stats()
+
+def get_connection(use_db=True, max_retries=None, retry_delay=None):
+    """Get a connection to the MySQL database.
+
+    Connections bound to the application database come from the shared pool;
+    calling close() on them returns them to the pool. Server-level connections
+    (use_db=False, used to create the database) are opened directly.
+    """
+    if not use_db:
+        return _connect(use_db=False, max_retries=max_retries, retry_delay=retry_delay)
+    return get_pool().acquire()
 
 def execute_query(query, params=None, fetch=True, max_retries=3):
-    """Execute a query with retry logic"""
-    conn = None
-    cursor = None
-    retries = 0
-    last_error = None
-    
-    while retries < max_retries:
+    """Execute a query, retrying connection-level failures with backoff"""
+    deadline = time.monotonic() + DB_RETRY_DEADLINE
+    attempt = 0
+
+    while True:
+        conn = None
+        cursor = None
         try:
             conn = get_connection()
             cursor = conn.cursor()
@@ -79,20 +636,140 @@ def execute_query(query, params=None, fetch=True, max_retries=3):
             return result
             
         except pymysql.Error as e:
-            last_error = e
-            retries += 1
-            if retries < max_retries:
-                print(f"Query attempt {retries} failed: {e}. Retrying...")
-                time.sleep(1)  # Wait before retry
-            else:
-                print(f"Failed to execute query after {max_retries} attempts. Last error: {e}")
-                raise last_error
+            delay = _backoff_delay(attempt, DB_RETRY_BASE_DELAY)
+            attempt += 1
+            if not _is_transient(e) or attempt >= max_retries or time.monotonic() + delay > deadline:
+                if _is_transient(e):
+                    print(f"Failed to execute query after {attempt} attempts. Last error: {e}")
+                raise
+            print(f"Query attempt {attempt} failed: {e}. Retrying in {delay:.2f} seconds...")
+            time.sleep(delay)
         finally:
             if cursor:
                 cursor.close()
             if conn:
                 conn.close()
 
+def _chunks(rows, size):
+    for start in range(0, len(rows), size):
+        yield start, rows[start:start + size]
+
+def execute_many(query, rows, batch_size=None, conn=None):
+    """Run one statement for many parameter rows with cursor.executemany, in batches.
+
+    PyMySQL rewrites `INSERT ... VALUES (...)` into multi-row inserts. When `conn`
+    is given (e.g. the request session) the caller owns the transaction;
+    otherwise a pooled connection is used and committed once per batch.
+    Returns the total number of affected rows.
+    """
+    rows = list(rows)
+    batch_size = batch_size or DB_BULK_BATCH_SIZE
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    cursor = conn.cursor()
+    affected = 0
+    try:
+        for _, chunk in _chunks(rows, batch_size):
+            affected += cursor.executemany(query, chunk) or 0
+            if own_conn:
+                conn.commit()
+        return affected
+    except pymysql.Error:
+        if own_conn:
+            conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        if own_conn:
+            conn.close()
+
+def bulk_insert(table, columns, rows, batch_size=None, on_duplicate_update=None, conn=None):
+    """Insert many rows with chunked multi-row `INSERT ... VALUES` statements.
+
+    rows: dicts keyed by column name, or tuples in `columns` order.
+    on_duplicate_update: columns to overwrite from the new row when a unique
+    key already exists (`ON DUPLICATE KEY UPDATE col = VALUES(col)`).
+
+    A failing batch is replayed row by row so that only the offending rows
+    fail. Returns one outcome per input row, in order:
+    {'index': i, 'success': bool, 'error': str or None}.
+    """
+    rows = list(rows)
+    batch_size = batch_size or DB_BULK_BATCH_SIZE
+    values = [tuple(row.get(c) for c in columns) if isinstance(row, dict) else tuple(row) for row in rows]
+    column_sql = ', '.join(f"`{c}`" for c in columns)
+    placeholders = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    suffix = ''
+    if on_duplicate_update:
+        suffix = ' ON DUPLICATE KEY UPDATE ' + ', '.join(f"`{c}` = VALUES(`{c}`)" for c in on_duplicate_update)
+
+    outcomes = [{'index': i, 'success': False, 'error': None} for i in range(len(rows))]
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        for start, chunk in _chunks(values, batch_size):
+            query = f"INSERT INTO `{table}` ({column_sql}) VALUES " + ', '.join([placeholders] * len(chunk)) + suffix
+            try:
+                cursor.execute(query, [v for row in chunk for v in row])
+                for i in range(start, start + len(chunk)):
+                    outcomes[i]['success'] = True
+            except pymysql.Error as batch_error:
+                # A failed statement only undoes itself in InnoDB; isolate the bad rows
+                print(f"bulk_insert: batch at row {start} failed ({batch_error}), retrying row by row")
+                single = f"INSERT INTO `{table}` ({column_sql}) VALUES {placeholders}{suffix}"
+                for offset, row in enumerate(chunk):
+                    try:
+                        cursor.execute(single, row)
+                        outcomes[start + offset]['success'] = True
+                    except pymysql.Error as e:
+                        outcomes[start + offset]['error'] = str(e)
+            if own_conn:
+                conn.commit()
+        return outcomes
+    except Exception:
+        if own_conn:
+            conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        if own_conn:
+            conn.close()
+
+def stream_query_batches(query, params=None, batch_size=None, dict_rows=True, conn=None):
+    """Yield lists of at most `batch_size` rows from an unbuffered server-side cursor.
+
+    Memory stays constant regardless of the result size. Pass the session's
+    `conn` to stream inside its transaction, seeing its uncommitted writes
+    without taking a second pool slot; the connection cannot run other
+    statements until the generator is exhausted or closed, so consume it
+    promptly. Without `conn` the generator holds a dedicated pooled connection.
+    """
+    batch_size = batch_size or DB_STREAM_BATCH_SIZE
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    cursor = conn.cursor(InstrumentedSSDictCursor if dict_rows else InstrumentedSSCursor)
+    try:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        # Closing an unbuffered cursor drains any unread rows
+        cursor.close()
+        if own_conn:
+            conn.close()
+
+def stream_query(query, params=None, batch_size=None, dict_rows=True, conn=None):
+    """Yield rows one by one from an unbuffered server-side cursor (see stream_query_batches)"""
+    for rows in stream_query_batches(query, params, batch_size=batch_size, dict_rows=dict_rows, conn=conn):
+        yield from rows
+
 def check_connection():
     """Check if database connection is working"""
     try:
@@ -0,0 +1,200 @@
+# database/migrate.py
+"""Versioned schema migrations.
+
+Migrations live in database/migrations as NNNN_description.py modules that
+define up(cursor) and down(cursor). Applied versions are recorded in the
+schema_migrations table.
+
+Each migration runs in one transaction, but MySQL commits every DDL
+statement (ALTER, CREATE, DROP) implicitly: a migration that fails halfway
+cannot be rolled back there, and leaves the schema partly changed without
+its schema_migrations row. Migrations therefore check the schema before
+each step (column_exists, column_type, index_exists, foreign_key_exists) so
+that running them again resumes where they stopped.
+
+Usage:
+    python -m database.migrate status
+    python -m database.migrate upgrade [--target VERSION]
+    python -m database.migrate downgrade --target VERSION
+"""
+import argparse
+import importlib
+import os
+import re
+
+import pymysql
+
+from database.db import get_connection, is_sqlite
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+MIGRATIONS_TABLE = 'schema_migrations'
+_FILENAME_RE = re.compile(r'^(\d{4})_(\w+)\.py$')
+
+
+def discover_migrations():
+    """Return [(version, name, module)] sorted by version"""
+    migrations = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = _FILENAME_RE.match(filename)
+        if not match:
+            continue
+        module = importlib.import_module(f"database.migrations.{filename[:-3]}")
+        migrations.append((int(match.group(1)), match.group(2), module))
+    migrations.sort(key=lambda m: m[0])
+    versions = [m[0] for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise Exception(f"Duplicate migration versions in {MIGRATIONS_DIR}")
+    return migrations
+
+
+def index_exists(cursor, table, index_name):
+    if is_sqlite():
+        cursor.execute("SELECT COUNT(*) AS count FROM sqlite_master WHERE type = 'index' AND name = %s", (index_name,))
+        return cursor.fetchone()['count'] > 0
+    cursor.execute("""
+        SELECT COUNT(*) AS count FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+    """, (table, index_name))
+    return cursor.fetchone()['count'] > 0
+
+
+def column_exists(cursor, table, column_name):
+    if is_sqlite():
+        cursor.execute(f"SELECT COUNT(*) AS count FROM pragma_table_info('{table}') WHERE name = %s", (column_name,))
+        return cursor.fetchone()['count'] > 0
+    cursor.execute("""
+        SELECT COUNT(*) AS count FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+    """, (table, column_name))
+    return cursor.fetchone()['count'] > 0
+
+
+def column_type(cursor, table, column_name):
+    """Declared type of a column in lowercase (e.g. 'bigint unsigned'), None if it does not exist"""
+    if is_sqlite():
+        cursor.execute(f"SELECT type FROM pragma_table_info('{table}') WHERE name = %s", (column_name,))
+        row = cursor.fetchone()
+        return row['type'].lower() if row else None
+    cursor.execute("""
+        SELECT column_type FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+    """, (table, column_name))
+    row = cursor.fetchone()
+    return row['column_type'].lower() if row else None
+
+
+def foreign_key_exists(cursor, table, constraint_name):
+    if is_sqlite():
+        # SQLite constraints are part of the table definition; migrations rebuild tables instead
+        raise NotImplementedError("foreign_key_exists is not available on SQLite")
+    cursor.execute("""
+        SELECT COUNT(*) AS count FROM information_schema.table_constraints
+        WHERE table_schema = DATABASE() AND table_name = %s AND constraint_name = %s
+          AND constraint_type = 'FOREIGN KEY'
+    """, (table, constraint_name))
+    return cursor.fetchone()['count'] > 0
+
+
+def _applied_versions(cursor):
+    try:
+        cursor.execute(f"SELECT version FROM {MIGRATIONS_TABLE}")
+    except pymysql.err.ProgrammingError:
+        # First run: the bookkeeping table does not exist yet
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+                version INT NOT NULL PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """)
+        return set()
+    return {row['version'] for row in cursor.fetchall()}
+
+
+def status():
+    """Return [(version, name, applied)] for every known migration"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        applied = _applied_versions(cursor)
+        conn.commit()
+        return [(version, name, version in applied) for version, name, _ in discover_migrations()]
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def upgrade(target=None):
+    """Apply pending migrations up to `target` (default: latest). Returns applied versions."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    done = []
+    try:
+        applied = _applied_versions(cursor)
+        conn.commit()
+        for version, name, module in discover_migrations():
+            if version in applied or (target is not None and version > target):
+                continue
+            print(f"Applying migration {version:04d}_{name}...")
+            try:
+                module.up(cursor)
+                cursor.execute(f"INSERT INTO {MIGRATIONS_TABLE} (version, name) VALUES (%s, %s)", (version, name))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Migration {version:04d}_{name} failed: {e}")
+                raise
+            done.append(version)
+        return done
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def downgrade(target):
+    """Revert applied migrations newer than `target` (0 reverts everything). Returns reverted versions."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    done = []
+    try:
+        applied = _applied_versions(cursor)
+        conn.commit()
+        for version, name, module in reversed(discover_migrations()):
+            if version not in applied or version <= target:
+                continue
+            print(f"Reverting migration {version:04d}_{name}...")
+            try:
+                module.down(cursor)
+                cursor.execute(f"DELETE FROM {MIGRATIONS_TABLE} WHERE version = %s", (version,))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Reverting {version:04d}_{name} failed: {e}")
+                raise
+            done.append(version)
+        return done
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Database schema migrations')
+    parser.add_argument('command', choices=['status', 'upgrade', 'downgrade'])
+    parser.add_argument('--target', type=int, default=None, help='Migration version to stop at')
+    args = parser.parse_args(argv)
+
+    if args.command == 'status':
+        for version, name, applied in status():
+            print(f"[{'x' if applied else ' '}] {version:04d}_{name}")
+    elif args.command == 'upgrade':
+        from models import ensure_database_and_tables
+        ensure_database_and_tables(target=args.target)
+    else:
+        if args.target is None:
+            parser.error('downgrade requires --target')
+        downgrade(args.target)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# database/migrations/0001_initial_schema.py
+"""Initial schema: students, rooms, filieres and users.
+
+Uses CREATE TABLE IF NOT EXISTS so databases created before migrations
+existed are adopted as-is.
+"""
+
+
+def up(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS students (
+        id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        nom VARCHAR(255) NOT NULL,
+        prenom VARCHAR(255) NOT NULL,
+        sexe ENUM('M','F') DEFAULT NULL,
+        matricule VARCHAR(255) NOT NULL,
+        cin VARCHAR(255) NOT NULL,
+        date_naissance DATE NOT NULL,
+        nationalite VARCHAR(255) NOT NULL,
+        telephone VARCHAR(255) NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        annee_universitaire VARCHAR(255) NOT NULL,
+        filiere_id VARCHAR(255) NOT NULL,
+        dossier_medicale TEXT NOT NULL,
+        observation TEXT DEFAULT NULL,
+        photo VARCHAR(255) DEFAULT NULL,
+        laureat VARCHAR(255) DEFAULT NULL,
+        num_chambre VARCHAR(255) DEFAULT NULL,
+        mobilite VARCHAR(255) DEFAULT NULL,
+        vie_associative VARCHAR(255) DEFAULT NULL,
+        bourse VARCHAR(255) NOT NULL,
+        type_section VARCHAR(32) DEFAULT 'Interne',
+        created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS rooms (
+        id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        room_number VARCHAR(32) NOT NULL,
+        pavilion VARCHAR(64) NOT NULL,
+        room_type ENUM('single','double','triple') NOT NULL,
+        capacity INT NOT NULL,
+        is_used BOOLEAN DEFAULT 0,
+        created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS filieres (
+        id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL UNIQUE,
+        created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS users (
+        id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        username VARCHAR(255) NOT NULL UNIQUE,
+        password VARCHAR(255) NOT NULL,
+        role VARCHAR(50) NOT NULL DEFAULT 'user',
+        created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    ''')
+
+
+def down(cursor):
+    for table in ('students', 'rooms', 'filieres', 'users'):
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
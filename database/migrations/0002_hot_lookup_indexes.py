@@ -0,0 +1,38 @@
+# database/migrations/0002_hot_lookup_indexes.py
+"""Secondary indexes for the columns used in joins, filters and ORDER BY."""
+from database.migrate import index_exists
+
+INDEXES = [
+    ('students', 'idx_students_num_chambre', 'INDEX', 'num_chambre'),
+    ('students', 'idx_students_filiere_id', 'INDEX', 'filiere_id'),
+    ('students', 'uq_students_matricule', 'UNIQUE INDEX', 'matricule'),
+    ('students', 'idx_students_cin', 'INDEX', 'cin'),
+    ('students', 'idx_students_created_at', 'INDEX', 'created_at'),
+    ('rooms', 'uq_rooms_room_number', 'UNIQUE INDEX', 'room_number'),
+]
+
+
+def _check_unique(cursor, table, column):
+    cursor.execute(f"""
+        SELECT {column} AS value, COUNT(*) AS count FROM {table}
+        GROUP BY {column} HAVING COUNT(*) > 1 LIMIT 10
+    """)
+    duplicates = cursor.fetchall()
+    if duplicates:
+        values = ', '.join(str(d['value']) for d in duplicates)
+        raise Exception(f"Impossible d'ajouter l'index unique sur {table}.{column}: doublons ({values})")
+
+
+def up(cursor):
+    for table, name, kind, column in INDEXES:
+        if index_exists(cursor, table, name):
+            continue
+        if kind.startswith('UNIQUE'):
+            _check_unique(cursor, table, column)
+        cursor.execute(f"CREATE {kind} {name} ON {table} ({column})")
+
+
+def down(cursor):
+    for table, name, _, _ in reversed(INDEXES):
+        if index_exists(cursor, table, name):
+            cursor.execute(f"DROP INDEX {name} ON {table}")
@@ -0,0 +1,20 @@
+# database/migrations/0003_room_history.py
+"""room_history table expected by models/room_history.py."""
+
+
+def up(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS room_history (
+        id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        student_id BIGINT UNSIGNED NOT NULL,
+        room_number VARCHAR(32) NOT NULL,
+        year INT NOT NULL,
+        created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_room_history_student (student_id, year),
+        INDEX idx_room_history_room (room_number, year)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    ''')
+
+
+def down(cursor):
+    cursor.execute("DROP TABLE IF EXISTS room_history")
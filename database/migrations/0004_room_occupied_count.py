@@ -0,0 +1,18 @@
+# database/migrations/0004_room_occupied_count.py
+"""Denormalized rooms.occupied_count, backfilled from students.num_chambre."""
+from database.migrate import column_exists
+
+
+def up(cursor):
+    if not column_exists(cursor, 'rooms', 'occupied_count'):
+        cursor.execute("ALTER TABLE rooms ADD COLUMN occupied_count INT NOT NULL DEFAULT 0")
+    cursor.execute("""
+        UPDATE rooms SET
+            occupied_count = (SELECT COUNT(*) FROM students s WHERE s.num_chambre = rooms.room_number),
+            is_used = ((SELECT COUNT(*) FROM students s WHERE s.num_chambre = rooms.room_number) >= capacity)
+    """)
+
+
+def down(cursor):
+    if column_exists(cursor, 'rooms', 'occupied_count'):
+        cursor.execute("ALTER TABLE rooms DROP COLUMN occupied_count")
@@ -0,0 +1,161 @@
+# database/migrations/0005_integer_foreign_keys.py
+"""Integer foreign keys: students.filiere_id becomes BIGINT, students.room_id is added.
+
+filiere_id values that do not name an existing filiere, and num_chambre
+values that are empty or the 'no room' sentinel, are cleared to NULL.
+room_id is backfilled from num_chambre, which is kept as the display value.
+Both references use ON DELETE SET NULL, as deleting a filiere or a room
+already left its students without one.
+
+SQLite cannot change a column type or add a constraint, so there the
+students table is rebuilt with the new definition and its rows copied over.
+On MySQL every step checks the schema first, so a run interrupted between
+two implicitly committed ALTERs resumes where it stopped.
+"""
+from database.db import is_sqlite
+from database.migrate import column_exists, column_type, foreign_key_exists, index_exists
+
+STUDENTS_TABLE = '''
+    CREATE TABLE students (
+        id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        nom VARCHAR(255) NOT NULL,
+        prenom VARCHAR(255) NOT NULL,
+        sexe ENUM('M','F') DEFAULT NULL,
+        matricule VARCHAR(255) NOT NULL,
+        cin VARCHAR(255) NOT NULL,
+        date_naissance DATE NOT NULL,
+        nationalite VARCHAR(255) NOT NULL,
+        telephone VARCHAR(255) NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        annee_universitaire VARCHAR(255) NOT NULL,
+        filiere_id {filiere_type},
+        dossier_medicale TEXT NOT NULL,
+        observation TEXT DEFAULT NULL,
+        photo VARCHAR(255) DEFAULT NULL,
+        laureat VARCHAR(255) DEFAULT NULL,
+        num_chambre VARCHAR(255) DEFAULT NULL,{room_column}
+        mobilite VARCHAR(255) DEFAULT NULL,
+        vie_associative VARCHAR(255) DEFAULT NULL,
+        bourse VARCHAR(255) NOT NULL,
+        type_section VARCHAR(32) DEFAULT 'Interne',
+        created_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP{constraints}
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+'''
+
+FOREIGN_KEYS = '''
+        CONSTRAINT fk_students_filiere FOREIGN KEY (filiere_id) REFERENCES filieres (id) ON DELETE SET NULL,
+        CONSTRAINT fk_students_room FOREIGN KEY (room_id) REFERENCES rooms (id) ON DELETE SET NULL'''
+MYSQL_FOREIGN_KEYS = [
+    ('fk_students_filiere', 'FOREIGN KEY (filiere_id) REFERENCES filieres (id) ON DELETE SET NULL'),
+    ('fk_students_room', 'FOREIGN KEY (room_id) REFERENCES rooms (id) ON DELETE SET NULL'),
+]
+
+# SQLite compares a TEXT value with an INTEGER column numerically, so '02' and ' 2'
+# match filiere 2 while values that are not numbers match nothing and become NULL
+FILIERE_ID_FROM_OLD = "(SELECT f.id FROM filieres f WHERE f.id = students_old.filiere_id)"
+
+BACKFILL_ROOM_ID = '''
+    UPDATE students SET room_id = (SELECT r.id FROM rooms r WHERE r.room_number = students.num_chambre)
+    WHERE num_chambre IS NOT NULL
+'''
+
+
+def _clear_room_sentinels(cursor):
+    cursor.execute("UPDATE students SET num_chambre = NULL WHERE num_chambre IN ('', 'no room')")
+
+
+def _clean_references(cursor):
+    """Normalise filiere_id to existing ids (else NULL) and clear empty room sentinels"""
+    cursor.execute("SELECT id FROM filieres")
+    valid = {str(row['id']) for row in cursor.fetchall()}
+    cursor.execute("SELECT DISTINCT filiere_id FROM students WHERE filiere_id IS NOT NULL")
+    orphaned = 0
+    for row in cursor.fetchall():
+        value = row['filiere_id']
+        normalized = str(value).strip()
+        if normalized.isdigit():
+            normalized = str(int(normalized))
+        if normalized in valid:
+            if normalized != value:
+                cursor.execute("UPDATE students SET filiere_id = %s WHERE filiere_id = %s", (normalized, value))
+        else:
+            cursor.execute("UPDATE students SET filiere_id = NULL WHERE filiere_id = %s", (value,))
+            orphaned += cursor.rowcount
+    if orphaned:
+        print(f"{orphaned} student(s) referenced a missing filiere; filiere_id cleared")
+    _clear_room_sentinels(cursor)
+
+
+def _rebuild_students_sqlite(cursor, create_sql, expressions=None):
+    """Recreate students from create_sql, copying shared columns and restoring its indexes.
+
+    `expressions` maps a column to the SQL expression (over students_old) that fills it.
+    """
+    expressions = expressions or {}
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'students' AND sql IS NOT NULL")
+    indexes = [row['sql'] for row in cursor.fetchall()]
+    cursor.execute("SELECT name FROM pragma_table_info('students')")
+    old_columns = [row['name'] for row in cursor.fetchall()]
+
+    cursor.execute("ALTER TABLE students RENAME TO students_old")
+    # The on-update trigger moved with the old table; drop it so the new table gets its own
+    cursor.execute("DROP TRIGGER IF EXISTS trg_students_updated_at_on_update")
+    cursor.execute(create_sql)
+    cursor.execute("SELECT name FROM pragma_table_info('students')")
+    columns = [row['name'] for row in cursor.fetchall() if row['name'] in old_columns]
+    values = ', '.join(expressions.get(column, column) for column in columns)
+    cursor.execute(f"INSERT INTO students ({', '.join(columns)}) SELECT {values} FROM students_old")
+    cursor.execute("DROP TABLE students_old")
+    for sql in indexes:
+        cursor.execute(sql)
+
+
+def up(cursor):
+    if is_sqlite():
+        # filiere_id is still NOT NULL here, so orphans are cleared while the rows are copied
+        cursor.execute("""
+            SELECT COUNT(*) AS count FROM students s
+            WHERE NOT EXISTS (SELECT 1 FROM filieres f WHERE f.id = s.filiere_id)
+        """)
+        orphaned = cursor.fetchone()['count']
+        if orphaned:
+            print(f"{orphaned} student(s) referenced a missing filiere; filiere_id cleared")
+        _clear_room_sentinels(cursor)
+        _rebuild_students_sqlite(cursor, STUDENTS_TABLE.format(
+            filiere_type='BIGINT UNSIGNED DEFAULT NULL',
+            room_column='\n        room_id BIGINT UNSIGNED DEFAULT NULL,',
+            constraints=',' + FOREIGN_KEYS), {'filiere_id': FILIERE_ID_FROM_OLD})
+    else:
+        if not column_type(cursor, 'students', 'filiere_id').startswith('bigint'):
+            # Allow NULL first so orphaned values can be cleared, then convert the type
+            cursor.execute("ALTER TABLE students MODIFY filiere_id VARCHAR(255) NULL")
+            _clean_references(cursor)
+            cursor.execute("ALTER TABLE students MODIFY filiere_id BIGINT UNSIGNED NULL")
+        else:
+            _clear_room_sentinels(cursor)
+        if not column_exists(cursor, 'students', 'room_id'):
+            cursor.execute("ALTER TABLE students ADD COLUMN room_id BIGINT UNSIGNED NULL AFTER num_chambre")
+    cursor.execute(BACKFILL_ROOM_ID)
+    if not index_exists(cursor, 'students', 'idx_students_room_id'):
+        cursor.execute("CREATE INDEX idx_students_room_id ON students (room_id)")
+    if not is_sqlite():
+        for name, definition in MYSQL_FOREIGN_KEYS:
+            if not foreign_key_exists(cursor, 'students', name):
+                cursor.execute(f"ALTER TABLE students ADD CONSTRAINT {name} {definition}")
+
+
+def down(cursor):
+    if is_sqlite():
+        cursor.execute("DROP INDEX idx_students_room_id ON students")
+        _rebuild_students_sqlite(cursor, STUDENTS_TABLE.format(
+            filiere_type='VARCHAR(255) DEFAULT NULL', room_column='', constraints=''))
+        return
+    for name, _ in MYSQL_FOREIGN_KEYS:
+        if foreign_key_exists(cursor, 'students', name):
+            cursor.execute(f"ALTER TABLE students DROP FOREIGN KEY {name}")
+    if index_exists(cursor, 'students', 'idx_students_room_id'):
+        cursor.execute("DROP INDEX idx_students_room_id ON students")
+    if column_exists(cursor, 'students', 'room_id'):
+        cursor.execute("ALTER TABLE students DROP COLUMN room_id")
+    cursor.execute("ALTER TABLE students MODIFY filiere_id VARCHAR(255) NULL")
@@ -0,0 +1,27 @@
+# database/migrations/0006_room_history_events.py
+"""room_history becomes an append-only log of assignment events.
+
+Each row records a student entering ('assign') or leaving ('release') a room
+during an academic year (its first calendar year). The room lookup index
+leads with the year and covers student_id, so "who lived in room X in year Y"
+reads one contiguous index range however many years have accumulated.
+"""
+from database.migrate import column_exists, index_exists
+
+
+def up(cursor):
+    if not column_exists(cursor, 'room_history', 'action'):
+        cursor.execute("ALTER TABLE room_history ADD COLUMN action ENUM('assign','release') NOT NULL DEFAULT 'assign'")
+    if index_exists(cursor, 'room_history', 'idx_room_history_room'):
+        cursor.execute("DROP INDEX idx_room_history_room ON room_history")
+    if not index_exists(cursor, 'room_history', 'idx_room_history_year_room'):
+        cursor.execute("CREATE INDEX idx_room_history_year_room ON room_history (year, room_number, student_id)")
+
+
+def down(cursor):
+    if index_exists(cursor, 'room_history', 'idx_room_history_year_room'):
+        cursor.execute("DROP INDEX idx_room_history_year_room ON room_history")
+    if not index_exists(cursor, 'room_history', 'idx_room_history_room'):
+        cursor.execute("CREATE INDEX idx_room_history_room ON room_history (room_number, year)")
+    if column_exists(cursor, 'room_history', 'action'):
+        cursor.execute("ALTER TABLE room_history DROP COLUMN action")
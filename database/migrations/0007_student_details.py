@@ -0,0 +1,54 @@
+# database/migrations/0007_student_details.py
+"""Move students.dossier_medicale and students.observation to student_details.
+
+The 1:1 side table keeps the TEXT columns out of the students rows every
+list, search and join reads; only single-student reads (profile, edit, PDF)
+join it. Rows are removed with their student (ON DELETE CASCADE).
+"""
+from database.db import is_sqlite
+from database.migrate import column_exists
+
+
+def up(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS student_details (
+        student_id BIGINT UNSIGNED NOT NULL PRIMARY KEY,
+        dossier_medicale TEXT DEFAULT NULL,
+        observation TEXT DEFAULT NULL,
+        CONSTRAINT fk_student_details_student FOREIGN KEY (student_id) REFERENCES students (id) ON DELETE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    ''')
+    if column_exists(cursor, 'students', 'dossier_medicale'):
+        # Rows copied by an interrupted earlier run were committed by MySQL's implicit DDL commit
+        cursor.execute('''
+            INSERT INTO student_details (student_id, dossier_medicale, observation)
+            SELECT s.id, s.dossier_medicale, s.observation FROM students s
+            WHERE NOT EXISTS (SELECT 1 FROM student_details d WHERE d.student_id = s.id)
+        ''')
+        if is_sqlite():
+            # SQLite drops one column per statement
+            cursor.execute("ALTER TABLE students DROP COLUMN dossier_medicale")
+            cursor.execute("ALTER TABLE students DROP COLUMN observation")
+        else:
+            cursor.execute("ALTER TABLE students DROP COLUMN dossier_medicale, DROP COLUMN observation")
+
+
+def down(cursor):
+    if is_sqlite():
+        cursor.execute("ALTER TABLE students ADD COLUMN dossier_medicale TEXT DEFAULT NULL")
+        cursor.execute("ALTER TABLE students ADD COLUMN observation TEXT DEFAULT NULL")
+    elif not column_exists(cursor, 'students', 'dossier_medicale'):
+        cursor.execute('''
+            ALTER TABLE students
+                ADD COLUMN dossier_medicale TEXT NULL AFTER filiere_id,
+                ADD COLUMN observation TEXT NULL AFTER dossier_medicale
+        ''')
+    cursor.execute('''
+        UPDATE students SET
+            dossier_medicale = (SELECT d.dossier_medicale FROM student_details d WHERE d.student_id = students.id),
+            observation = (SELECT d.observation FROM student_details d WHERE d.student_id = students.id)
+    ''')
+    cursor.execute("UPDATE students SET dossier_medicale = '' WHERE dossier_medicale IS NULL")
+    if not is_sqlite():
+        cursor.execute("ALTER TABLE students MODIFY dossier_medicale TEXT NOT NULL")
+    cursor.execute("DROP TABLE IF EXISTS student_details")
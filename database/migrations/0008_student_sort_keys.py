@@ -0,0 +1,20 @@
+# database/migrations/0008_student_sort_keys.py
+"""Index the student list sort keys for keyset pagination.
+
+Keyset pages seek on (sort column, id). InnoDB secondary indexes end with
+the primary key, so one index per sort column serves both: created_at and
+matricule already have theirs (0002), this adds nom. Rows without
+created_at could never be reached by a seek, so they get the migration time.
+"""
+from database.migrate import index_exists
+
+
+def up(cursor):
+    cursor.execute("UPDATE students SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    if not index_exists(cursor, 'students', 'idx_students_nom'):
+        cursor.execute("CREATE INDEX idx_students_nom ON students (nom)")
+
+
+def down(cursor):
+    if index_exists(cursor, 'students', 'idx_students_nom'):
+        cursor.execute("DROP INDEX idx_students_nom ON students")
@@ -0,0 +1,44 @@
+# database/migrations/0009_student_search.py
+"""student_search: folded search terms of every student (see models.search).
+
+On MySQL the terms get a FULLTEXT index with the ngram parser, so keyword
+search reads the index instead of scanning students. The index is built
+without stopwords: the ngram parser drops every token containing one, which
+would hide most two-letter fragments of names.
+"""
+from database.db import is_sqlite
+from database.migrate import index_exists
+from models.search import search_terms
+
+BATCH_SIZE = 500
+
+
+def up(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS student_search (
+        student_id BIGINT UNSIGNED NOT NULL PRIMARY KEY,
+        terms VARCHAR(1024) NOT NULL,
+        CONSTRAINT fk_student_search_student FOREIGN KEY (student_id) REFERENCES students (id) ON DELETE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    ''')
+    # Skip rows an interrupted earlier run already wrote (MySQL commits them with the index DDL)
+    cursor.execute("""
+        SELECT s.id, s.nom, s.prenom, s.matricule, s.cin FROM students s
+        WHERE NOT EXISTS (SELECT 1 FROM student_search ss WHERE ss.student_id = s.id)
+    """)
+    rows = [(student['id'], search_terms(student)) for student in cursor.fetchall()]
+    for start in range(0, len(rows), BATCH_SIZE):
+        chunk = rows[start:start + BATCH_SIZE]
+        cursor.execute("INSERT INTO student_search (student_id, terms) VALUES " + ', '.join(['(%s, %s)'] * len(chunk)),
+                       [value for row in chunk for value in row])
+    if not is_sqlite() and not index_exists(cursor, 'student_search', 'ft_student_search_terms'):
+        cursor.execute("SET SESSION innodb_ft_enable_stopword = 0")
+        try:
+            cursor.execute("CREATE FULLTEXT INDEX ft_student_search_terms ON student_search (terms) WITH PARSER ngram")
+        finally:
+            # The connection goes back to the pool: do not leak the setting to other borrowers
+            cursor.execute("SET SESSION innodb_ft_enable_stopword = DEFAULT")
+
+
+def down(cursor):
+    cursor.execute("DROP TABLE IF EXISTS student_search")
@@ -0,0 +1,163 @@
+# database/mysqlclient_backend.py
+"""mysqlclient (MySQLdb) driver exposing the PyMySQL API the app uses.
+
+Selected with DB_DRIVER=mysqlclient. mysqlclient decodes result rows in C,
+which is much cheaper than PyMySQL's pure-Python protocol on large reads
+(student lists, exports). Cursor classes are requested with the PyMySQL
+classes from database.db and mapped to their MySQLdb equivalents; dict
+cursors return lists of dicts like PyMySQL's DictCursor, and MySQLdb errors
+are re-raised as the matching pymysql.err classes so existing error handling
+keeps working.
+"""
+import MySQLdb
+import MySQLdb.connections
+import MySQLdb.cursors
+import pymysql
+from pymysql import cursors as pymysql_cursors
+
+from database.db import InstrumentedCursorMixin
+
+
+# ---------------------------------------------------------------------------
+# Errors
+# ---------------------------------------------------------------------------
+
+# Most specific first: the MySQLdb hierarchy mirrors PEP 249 like PyMySQL's
+_ERROR_MAP = [
+    (MySQLdb.IntegrityError, pymysql.err.IntegrityError),
+    (MySQLdb.ProgrammingError, pymysql.err.ProgrammingError),
+    (MySQLdb.DataError, pymysql.err.DataError),
+    (MySQLdb.NotSupportedError, pymysql.err.NotSupportedError),
+    (MySQLdb.InternalError, pymysql.err.InternalError),
+    (MySQLdb.OperationalError, pymysql.err.OperationalError),
+    (MySQLdb.InterfaceError, pymysql.err.InterfaceError),
+    (MySQLdb.DatabaseError, pymysql.err.DatabaseError),
+]
+
+def _as_pymysql_error(e):
+    for source, target in _ERROR_MAP:
+        if isinstance(e, source):
+            return target(*e.args)
+    return pymysql.err.Error(*e.args)
+
+
+# ---------------------------------------------------------------------------
+# Cursors
+# ---------------------------------------------------------------------------
+
+class _PyMySQLCompatMixin:
+    """PyMySQL behaviour on top of MySQLdb cursors: list results, pymysql errors"""
+
+    def execute(self, query, args=None):
+        try:
+            return super().execute(query, args)
+        except MySQLdb.Error as e:
+            raise _as_pymysql_error(e) from e
+
+    def executemany(self, query, args):
+        try:
+            return super().executemany(query, args)
+        except MySQLdb.Error as e:
+            raise _as_pymysql_error(e) from e
+
+    def fetchone(self):
+        try:
+            return super().fetchone()
+        except MySQLdb.Error as e:
+            raise _as_pymysql_error(e) from e
+
+    def fetchmany(self, size=None):
+        try:
+            return list(super().fetchmany(size))
+        except MySQLdb.Error as e:
+            raise _as_pymysql_error(e) from e
+
+    def fetchall(self):
+        try:
+            return list(super().fetchall())
+        except MySQLdb.Error as e:
+            raise _as_pymysql_error(e) from e
+
+
+class Cursor(_PyMySQLCompatMixin, MySQLdb.cursors.Cursor):
+    pass
+
+class DictCursor(_PyMySQLCompatMixin, MySQLdb.cursors.DictCursor):
+    pass
+
+class SSCursor(_PyMySQLCompatMixin, MySQLdb.cursors.SSCursor):
+    pass
+
+class SSDictCursor(_PyMySQLCompatMixin, MySQLdb.cursors.SSDictCursor):
+    pass
+
+class InstrumentedCursor(InstrumentedCursorMixin, Cursor):
+    pass
+
+class InstrumentedDictCursor(InstrumentedCursorMixin, DictCursor):
+    pass
+
+class InstrumentedSSCursor(InstrumentedCursorMixin, SSCursor):
+    pass
+
+class InstrumentedSSDictCursor(InstrumentedCursorMixin, SSDictCursor):
+    pass
+
+
+# (instrumented, dict rows, unbuffered) -> MySQLdb cursor class
+_CURSOR_CLASSES = {
+    (False, False, False): Cursor,
+    (False, True, False): DictCursor,
+    (False, False, True): SSCursor,
+    (False, True, True): SSDictCursor,
+    (True, False, False): InstrumentedCursor,
+    (True, True, False): InstrumentedDictCursor,
+    (True, False, True): InstrumentedSSCursor,
+    (True, True, True): InstrumentedSSDictCursor,
+}
+
+def _cursor_class(cursorclass):
+    """Map a PyMySQL cursor class to the MySQLdb class with the same behaviour"""
+    if issubclass(cursorclass, MySQLdb.cursors.BaseCursor):
+        return cursorclass
+    return _CURSOR_CLASSES[(issubclass(cursorclass, InstrumentedCursorMixin),
+                            issubclass(cursorclass, pymysql_cursors.DictCursorMixin),
+                            issubclass(cursorclass, pymysql_cursors.SSCursor))]
+
+
+# ---------------------------------------------------------------------------
+# Connection
+# ---------------------------------------------------------------------------
+
+class MySQLdbConnection(MySQLdb.connections.Connection):
+    """MySQLdb connection with the PyMySQL methods used by the pool, sessions and models"""
+
+    def cursor(self, cursorclass=None):
+        return super().cursor(_cursor_class(cursorclass) if cursorclass else None)
+
+    def commit(self):
+        try:
+            super().commit()
+        except MySQLdb.Error as e:
+            raise _as_pymysql_error(e) from e
+
+    def rollback(self):
+        try:
+            super().rollback()
+        except MySQLdb.Error as e:
+            raise _as_pymysql_error(e) from e
+
+    def ping(self, reconnect=False):
+        # The pool never asks the driver to reconnect silently; a failed ping means a fresh connection
+        try:
+            super().ping()
+        except MySQLdb.Error as e:
+            raise _as_pymysql_error(e) from e
+
+
+def connect(cursorclass, **params):
+    """Open a mysqlclient connection from pymysql.connect()-style keyword arguments"""
+    try:
+        return MySQLdbConnection(cursorclass=_cursor_class(cursorclass), **params)
+    except MySQLdb.Error as e:
+        raise _as_pymysql_error(e) from e
@@ -0,0 +1,210 @@
+# database/session.py
+from flask import g, has_request_context
+from database.cache import invalidate_tables, query_cache
+from database.db import get_connection
+
+
+class IdentityMap:
+    """Rows loaded during one request, by (table, key column, key value).
+
+    A row is registered under each of its keys (primary and natural keys),
+    so a lookup by id after a lookup by number finds the same row. Each row
+    records the tables it was read from; writing any of them evicts it.
+    Callers get copies, so mutating a returned row never alters the map.
+    """
+
+    def __init__(self):
+        # (table, column, str(value)) -> (row, tables it depends on)
+        self._rows = {}
+
+    def get(self, table, column, value):
+        entry = self._rows.get((table, column, str(value)))
+        return None if entry is None else dict(entry[0])
+
+    def add(self, table, row, keys, depends=()):
+        if not row:
+            return
+        entry = (dict(row), frozenset((table,) + tuple(depends)))
+        for column in keys:
+            if row.get(column) is not None:
+                self._rows[(table, column, str(row[column]))] = entry
+
+    def evict(self, *tables):
+        tables = set(tables)
+        for key in [key for key, (_, depends) in self._rows.items() if depends & tables]:
+            del self._rows[key]
+
+    def clear(self):
+        self._rows.clear()
+
+    def __len__(self):
+        return len(self._rows)
+
+
+class DbSession:
+    """Unit of work: one pooled connection and one transaction.
+
+    Inside a Flask request the session is shared by every model through `g`
+    and commits once, when the request finishes (`deferred=True`). Outside a
+    request (desktop app, scripts) each model owns a session that commits
+    immediately, as before.
+
+    Models report the tables they write with mark_dirty(); the query cache
+    is invalidated for those tables once the transaction commits.
+
+    Request sessions also carry an IdentityMap so a row is read once per
+    request; sessions outside a request can live for the whole process and
+    have none.
+
+    In a deferred session each commit() sets a savepoint, so rollback()
+    undoes only the writes since the last commit(), as it does when commits
+    are immediate: a model method that fails does not discard the writes
+    earlier methods of the request reported as done.
+    """
+
+    SAVEPOINT = 'model_commit'
+
+    def __init__(self, deferred=False):
+        self.deferred = deferred
+        self.pending = False
+        self.dirty_tables = set()
+        # Cache generation at the start of the current transaction
+        self.generation = query_cache.generation
+        self.identity = IdentityMap() if deferred else None
+        self._after_commit = []
+        # (dirty tables, after_commit callbacks) when the savepoint was set, None without one
+        self._savepoint = None
+        self._conn = None
+        self._cursor = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self.generation = query_cache.generation
+            self._conn = get_connection()
+        return self._conn
+
+    @property
+    def cursor(self):
+        if self._cursor is None:
+            self._cursor = self.conn.cursor()
+        return self._cursor
+
+    def mark_dirty(self, *tables):
+        """Record tables written in this transaction; cached reads of them bypass the cache until commit"""
+        self.dirty_tables.update(tables)
+        if self.identity is not None:
+            self.identity.evict(*tables)
+
+    def after_commit(self, callback):
+        """Call callback() once the current transaction commits; a rollback drops it"""
+        self._after_commit.append(callback)
+
+    def _end_transaction(self, committed):
+        if committed and self.dirty_tables:
+            invalidate_tables(*self.dirty_tables)
+        self.dirty_tables.clear()
+        callbacks, self._after_commit = self._after_commit, []
+        if committed:
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"[ERROR] after_commit callback: {e}")
+        self._savepoint = None
+        self.generation = query_cache.generation
+        if self.identity is not None:
+            self.identity.clear()
+
+    def commit(self):
+        """Commit now, or mark the work as pending (behind a savepoint) when the commit is deferred"""
+        if self._conn is None:
+            return
+        if self.deferred:
+            self.cursor.execute(f"SAVEPOINT {self.SAVEPOINT}")
+            self._savepoint = (set(self.dirty_tables), list(self._after_commit))
+            self.pending = True
+            return
+        self._conn.commit()
+        self._end_transaction(True)
+
+    def rollback(self):
+        """Undo the writes since the last commit(); without a savepoint, the whole open transaction"""
+        if self._savepoint is None or self._conn is None:
+            self._rollback_transaction()
+            return
+        try:
+            self.cursor.execute(f"ROLLBACK TO SAVEPOINT {self.SAVEPOINT}")
+        except Exception:
+            # The server already rolled the transaction back (deadlock): the earlier writes are
+            # lost too, so fail the request instead of reporting them as done
+            self._rollback_transaction()
+            raise
+        self.dirty_tables, self._after_commit = set(self._savepoint[0]), list(self._savepoint[1])
+        if self.identity is not None:
+            # Rows read since the savepoint may hold the undone writes
+            self.identity.clear()
+
+    def _rollback_transaction(self):
+        self.pending = False
+        if self._conn is not None:
+            self._conn.rollback()
+        self._end_transaction(False)
+
+    def flush(self):
+        """Commit pending work now, even for a deferred session"""
+        if self._conn is not None and self.pending:
+            self._conn.commit()
+            self._end_transaction(True)
+        self.pending = False
+
+    def close(self, commit=False):
+        """Finish the transaction and hand the connection back to the pool"""
+        if self._conn is None:
+            return
+        try:
+            if commit:
+                self.flush()
+            else:
+                self._rollback_transaction()
+        finally:
+            if self._cursor is not None:
+                try:
+                    self._cursor.close()
+                except Exception:
+                    pass
+            self._conn.close()
+            self._cursor = None
+            self._conn = None
+
+
+def get_session():
+    """Return the session of the current Flask request, or None outside a request"""
+    if not has_request_context():
+        return None
+    if 'db_session' not in g:
+        g.db_session = DbSession(deferred=True)
+    return g.db_session
+
+
+def register_session(app):
+    """Commit the request's unit of work after the view and always release it on teardown"""
+
+    @app.after_request
+    def commit_db_session(response):
+        session = g.get('db_session')
+        if session is not None and session.pending:
+            try:
+                session.flush()
+            except Exception as e:
+                print(f"[ERROR] commit_db_session: {e}")
+                session._rollback_transaction()
+                return app.make_response(('Erreur lors de l\'enregistrement des données', 500))
+        return response
+
+    @app.teardown_request
+    def close_db_session(exc):
+        session = g.pop('db_session', None)
+        if session is not None:
+            # Anything still pending here means the view failed before after_request
+            session.close(commit=False)
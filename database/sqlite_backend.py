@@ -0,0 +1,345 @@
+# database/sqlite_backend.py
+"""Embedded SQLite backend exposing the small part of the PyMySQL API the app uses.
+
+Selected with DB_BACKEND=sqlite. SQLITE_PATH is a file path, or ':memory:' for
+an in-process database shared by every pooled connection. Statements are
+translated on the fly for the MySQL-isms the models and migrations rely on:
+%s placeholders, SHOW TABLES, CREATE DATABASE, ENUM (also in ADD COLUMN), AUTO_INCREMENT,
+ON UPDATE CURRENT_TIMESTAMP, inline INDEX definitions, NOW() and
+ON DUPLICATE KEY UPDATE. sqlite3 errors are re-raised as the matching
+pymysql.err classes so existing error handling keeps working.
+"""
+import datetime
+import re
+import sqlite3
+import threading
+import time
+
+import pymysql
+from pymysql.cursors import DictCursorMixin, SSCursor
+
+from database.db import InstrumentedCursorMixin
+
+
+sqlite3.register_adapter(datetime.date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda d: d.isoformat(sep=' '))
+sqlite3.register_converter('DATE', lambda b: datetime.date.fromisoformat(b.decode()))
+sqlite3.register_converter('TIMESTAMP', lambda b: datetime.datetime.fromisoformat(b.decode()))
+
+
+# ---------------------------------------------------------------------------
+# Dialect translation
+# ---------------------------------------------------------------------------
+
+_PARAM_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|%s|%%")
+_CREATE_TABLE_RE = re.compile(r'^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\((.*)\)([^)]*)$',
+                              re.IGNORECASE | re.DOTALL)
+_INLINE_INDEX_RE = re.compile(r'^\s*(UNIQUE\s+)?(?:INDEX|KEY)\s+`?(\w+)`?\s*\(([^)]*)\)\s*$', re.IGNORECASE)
+_ON_UPDATE_RE = re.compile(r'^\s*`?(\w+)`?\s.*\bON\s+UPDATE\s+CURRENT_TIMESTAMP\b', re.IGNORECASE)
+_ON_DUPLICATE_RE = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b(.*)$', re.IGNORECASE | re.DOTALL)
+_ADD_COLUMN_RE = re.compile(r'^\s*ALTER\s+TABLE\s+`?\w+`?\s+ADD\s+COLUMN\b', re.IGNORECASE)
+_DROP_INDEX_RE = re.compile(r'^\s*DROP\s+INDEX\s+`?(\w+)`?\s+ON\s+`?\w+`?\s*;?\s*$', re.IGNORECASE)
+
+_DDL_RULES = [
+    (re.compile(r'\b(?:BIG)?INT(?:EGER)?(?:\s+UNSIGNED)?(?:\s+NOT\s+NULL)?\s+AUTO_INCREMENT\s+PRIMARY\s+KEY',
+                re.IGNORECASE), 'INTEGER PRIMARY KEY AUTOINCREMENT'),
+    (re.compile(r'(`?\w+`?)\s+ENUM\s*\(([^)]*)\)', re.IGNORECASE), r'\1 TEXT CHECK (\1 IN (\2))'),
+    (re.compile(r'\bUNSIGNED\b', re.IGNORECASE), ''),
+    (re.compile(r'\bON\s+UPDATE\s+CURRENT_TIMESTAMP\b', re.IGNORECASE), ''),
+    (re.compile(r'\b(?:ENGINE|(?:DEFAULT\s+)?CHARSET|(?:DEFAULT\s+)?CHARACTER\s+SET|COLLATE)\s*=?\s*\w+',
+                re.IGNORECASE), ''),
+]
+
+
+def _split_top_level(body):
+    """Split a CREATE TABLE body on commas that are not inside parentheses or quotes"""
+    parts, depth, quote, current = [], 0, None, []
+    for ch in body:
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"'):
+            quote = ch
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            parts.append(''.join(current))
+            current = []
+            continue
+        current.append(ch)
+    if ''.join(current).strip():
+        parts.append(''.join(current))
+    return parts
+
+
+def _translate_params(query):
+    def replace(match):
+        token = match.group(0)
+        if token == '%s':
+            return '?'
+        if token == '%%':
+            return '%'
+        return token
+    return _PARAM_RE.sub(replace, query)
+
+
+def _translate_create_table(match):
+    table, body, tail = match.group(1), match.group(2), match.group(3)
+    columns, extra = [], []
+    for part in _split_top_level(body):
+        index = _INLINE_INDEX_RE.match(part)
+        if index:
+            unique = 'UNIQUE ' if index.group(1) else ''
+            extra.append(f"CREATE {unique}INDEX IF NOT EXISTS {index.group(2)} ON {table} ({index.group(3)})")
+            continue
+        on_update = _ON_UPDATE_RE.match(part)
+        if on_update:
+            column = on_update.group(1)
+            extra.append(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{column}_on_update AFTER UPDATE ON {table} "
+                f"FOR EACH ROW WHEN NEW.{column} IS OLD.{column} "
+                f"BEGIN UPDATE {table} SET {column} = CURRENT_TIMESTAMP WHERE rowid = NEW.rowid; END")
+        for pattern, replacement in _DDL_RULES:
+            part = pattern.sub(replacement, part)
+        columns.append(part.strip())
+    create = f"CREATE TABLE IF NOT EXISTS {table} (\n    " + ',\n    '.join(columns) + '\n)'
+    return [create] + extra
+
+
+def translate(query, has_params):
+    """Translate one MySQL statement into a list of SQLite statements (None: nothing to run)"""
+    if isinstance(query, bytes):
+        query = query.decode('utf-8')
+    if has_params:
+        query = _translate_params(query)
+    stripped = query.strip().rstrip(';').strip()
+    upper = stripped.upper()
+
+    if upper.startswith('CREATE DATABASE') or upper.startswith('USE '):
+        return None
+    if upper == 'SHOW TABLES':
+        return ["SELECT name AS Tables_in_main FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"]
+    create = _CREATE_TABLE_RE.match(stripped)
+    if create:
+        return _translate_create_table(create)
+    drop_index = _DROP_INDEX_RE.match(stripped)
+    if drop_index:
+        return [f"DROP INDEX IF EXISTS {drop_index.group(1)}"]
+    if _ADD_COLUMN_RE.match(stripped):
+        for pattern, replacement in _DDL_RULES:
+            stripped = pattern.sub(replacement, stripped)
+        return [stripped.strip()]
+
+    stripped = re.sub(r'\bNOW\(\)', 'CURRENT_TIMESTAMP', stripped, flags=re.IGNORECASE)
+    on_duplicate = _ON_DUPLICATE_RE.search(stripped)
+    if on_duplicate:
+        assignments = re.sub(r'\bVALUES\s*\(\s*(`?\w+`?)\s*\)', r'excluded.\1', on_duplicate.group(1), flags=re.IGNORECASE)
+        stripped = stripped[:on_duplicate.start()] + 'ON CONFLICT DO UPDATE SET' + assignments
+    return [stripped]
+
+
+# ---------------------------------------------------------------------------
+# Errors
+# ---------------------------------------------------------------------------
+
+def _as_pymysql_error(e):
+    message = str(e)
+    if isinstance(e, sqlite3.IntegrityError):
+        return pymysql.err.IntegrityError(1062, message)
+    if 'no such table' in message:
+        return pymysql.err.ProgrammingError(1146, message)
+    if 'syntax error' in message or 'no such column' in message:
+        return pymysql.err.ProgrammingError(1064, message)
+    if 'locked' in message or 'busy' in message:
+        return pymysql.err.OperationalError(1205, message)
+    if isinstance(e, sqlite3.ProgrammingError):
+        return pymysql.err.InterfaceError(0, message)
+    # Anything else is not a lost connection: keep it out of the retries and the circuit breaker
+    return pymysql.err.InternalError(0, message)
+
+
+# Seconds to wait for a lock held by another connection before giving up
+LOCK_TIMEOUT = 30
+
+def _retry_locked(operation, *args):
+    """Run operation(*args), waiting out locks held by other connections' transactions.
+
+    The busy timeout covers file locks, but a shared-cache table lock
+    (':memory:') fails at once with SQLITE_LOCKED: retry those with backoff.
+    """
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    delay = 0.001
+    while True:
+        try:
+            return operation(*args)
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e) or time.monotonic() + delay > deadline:
+                raise
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+
+# ---------------------------------------------------------------------------
+# Connection and cursor
+# ---------------------------------------------------------------------------
+
+class SQLiteCursor:
+    """PyMySQL-like cursor: dict or tuple rows, buffered unless created from an SSCursor class"""
+
+    def __init__(self, connection, dict_rows=True, unbuffered=False):
+        self.connection = connection
+        self._dict_rows = dict_rows
+        self._unbuffered = unbuffered
+        self._cursor = None
+        self._rows = []
+        self._pos = 0
+        self.description = None
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def _convert(self, row):
+        if row is None or not self._dict_rows:
+            return row
+        return {col[0]: value for col, value in zip(self.description, row)}
+
+    def execute(self, query, args=None):
+        statements = translate(query, args is not None)
+        self._rows, self._pos, self.description = [], 0, None
+        if statements is None:
+            self.rowcount = 0
+            return 0
+        if isinstance(args, dict):
+            raise pymysql.err.ProgrammingError(0, 'Named parameters are not supported by the SQLite backend')
+        params = tuple(args) if args is not None else ()
+        try:
+            for statement in statements:
+                self._cursor = _retry_locked(self.connection._raw.execute, statement,
+                                             params if '?' in statement else ())
+        except sqlite3.Error as e:
+            raise _as_pymysql_error(e) from e
+        self.description = self._cursor.description
+        self.lastrowid = self._cursor.lastrowid
+        if self.description is not None and not self._unbuffered:
+            self._rows = self._cursor.fetchall()
+            self.rowcount = len(self._rows)
+        else:
+            self.rowcount = self._cursor.rowcount
+        return self.rowcount
+
+    def executemany(self, query, args):
+        affected = 0
+        for params in args:
+            affected += max(self.execute(query, params), 0)
+        self.rowcount = affected
+        return affected
+
+    def fetchone(self):
+        if self._unbuffered:
+            return self._convert(self._cursor.fetchone()) if self._cursor else None
+        if self._pos >= len(self._rows):
+            return None
+        self._pos += 1
+        return self._convert(self._rows[self._pos - 1])
+
+    def fetchmany(self, size=None):
+        size = size or 1
+        if self._unbuffered:
+            return [self._convert(row) for row in self._cursor.fetchmany(size)] if self._cursor else []
+        rows = self._rows[self._pos:self._pos + size]
+        self._pos += len(rows)
+        return [self._convert(row) for row in rows]
+
+    def fetchall(self):
+        if self._unbuffered:
+            return [self._convert(row) for row in self._cursor.fetchall()] if self._cursor else []
+        rows = self._rows[self._pos:]
+        self._pos = len(self._rows)
+        return [self._convert(row) for row in rows]
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class InstrumentedSQLiteCursor(InstrumentedCursorMixin, SQLiteCursor):
+    pass
+
+
+class SQLiteConnection:
+    """Connection wrapper with the PyMySQL methods used by the pool, sessions and models"""
+
+    def __init__(self, raw, cursorclass):
+        self._raw = raw
+        self.cursorclass = cursorclass
+        self.open = True
+
+    def cursor(self, cursor=None):
+        cursorclass = cursor or self.cursorclass
+        # Keep query instrumentation when the requested class is an instrumented one
+        wrapper = InstrumentedSQLiteCursor if issubclass(cursorclass, InstrumentedCursorMixin) else SQLiteCursor
+        return wrapper(self,
+                       dict_rows=issubclass(cursorclass, DictCursorMixin),
+                       unbuffered=issubclass(cursorclass, SSCursor))
+
+    def commit(self):
+        try:
+            _retry_locked(self._raw.commit)
+        except sqlite3.Error as e:
+            raise _as_pymysql_error(e) from e
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def ping(self, reconnect=False):
+        if not self.open:
+            raise pymysql.err.InterfaceError(0, 'Connection is closed')
+
+    def select_db(self, db):
+        pass
+
+    def autocommit(self, value):
+        self._raw.isolation_level = None if value else ''
+
+    def get_autocommit(self):
+        return self._raw.isolation_level is None
+
+    def close(self):
+        if self.open:
+            self._raw.close()
+            self.open = False
+
+
+_memory_keeper = None
+_memory_lock = threading.Lock()
+
+def connect(path, name, cursorclass):
+    """Open a SQLite connection; ':memory:' maps to one shared in-memory database"""
+    global _memory_keeper
+    kwargs = {'detect_types': sqlite3.PARSE_DECLTYPES, 'check_same_thread': False, 'timeout': LOCK_TIMEOUT}
+    if path == ':memory:':
+        uri = f"file:{name}?mode=memory&cache=shared"
+        with _memory_lock:
+            if _memory_keeper is None:
+                # The in-memory database lives as long as one connection is open
+                _memory_keeper = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        raw = sqlite3.connect(uri, uri=True, **kwargs)
+    else:
+        raw = sqlite3.connect(path, **kwargs)
+        raw.execute('PRAGMA journal_mode = WAL')
+        raw.execute('PRAGMA synchronous = NORMAL')
+    # Enforce FOREIGN KEY clauses (ON DELETE SET NULL) like InnoDB does
+    raw.execute('PRAGMA foreign_keys = ON')
+    return SQLiteConnection(raw, cursorclass)
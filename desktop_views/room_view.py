@@ -53,7 +53,7 @@ class RoomListView(QWidget):
         self.load_rooms()
 
     def load_rooms(self):
-        rooms = self.controller.list_rooms()
+        rooms = self.controller.list_rooms('list')
         self.table.setRowCount(len(rooms))
         for row, room in enumerate(rooms):
             self.table.setItem(row, 0, QTableWidgetItem(str(room.get('id', 'Aucun'))))
@@ -89,7 +89,7 @@ class RoomListView(QWidget):
 
     def search(self, keyword):
         # No get_filtered_rooms in controller, so filter here
-        rooms = self.controller.list_rooms()
+        rooms = self.controller.list_rooms('list')
         if keyword:
             keyword_lower = keyword.lower()
             rooms = [r for r in rooms if keyword_lower in str(r.get('room_number', '')).lower() or keyword_lower in str(r.get('pavilion', '')).lower() or keyword_lower in str(r.get('room_type', '')).lower()]
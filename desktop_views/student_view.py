@@ -51,7 +51,7 @@ class StudentListView(QWidget):
         self.load_students()
 
     def load_students(self):
-        students = self.controller.list_students()
+        students = self.controller.list_students('list')
         self.table.setRowCount(len(students))
         for row, student in enumerate(students):
             self.table.setItem(row, 0, QTableWidgetItem(str(student.get('id', 'Aucun'))))
@@ -87,10 +87,12 @@ class StudentListView(QWidget):
             self.table.setCellWidget(row, 7, actions_widget)
 
     def search(self, keyword):
-        # Use get_filtered_students for search
-        students = self.controller.get_filtered_students(keyword=keyword) if keyword else self.controller.list_students()
-        self.table.setRowCount(len(students))
-        for row, student in enumerate(students):
+        # get_filtered_students streams its rows: append them to the table as they arrive
+        students = self.controller.get_filtered_students(keyword=keyword) if keyword else self.controller.list_students('list')
+        self.table.setRowCount(0)
+        for student in students:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
             self.table.setItem(row, 0, QTableWidgetItem(str(student.get('id', 'Aucun'))))
             self.table.setItem(row, 1, QTableWidgetItem(student.get('matricule', 'Aucun')))
             self.table.setItem(row, 2, QTableWidgetItem(student.get('nom', 'Aucun')))
@@ -128,6 +130,8 @@ class StudentListView(QWidget):
 
     def show_details(self, student):
         # Modern details dialog with action buttons
+        # List rows only carry the table columns; load the whole student for the dialog
+        student = self.controller.get_student(student.get('id')) or student
         dialog = QDialog(self)
         dialog.setWindowTitle('Détails étudiant')
         layout = QVBoxLayout()
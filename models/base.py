@@ -0,0 +1,87 @@
+# models/base.py
+from database.cache import cached_query
+from database.session import DbSession, get_session
+
+
+class BaseModel:
+    """Resolves the database session lazily so model instances can be long-lived.
+
+    During a Flask request every model shares the request session; elsewhere
+    the instance falls back to a private session that commits immediately.
+    Pass `session` to make a model work inside another model's transaction.
+    """
+
+    def __init__(self, session=None):
+        self._own_session = None
+        self._shared_session = session
+
+    @property
+    def session(self):
+        if self._shared_session is not None:
+            return self._shared_session
+        session = get_session()
+        if session is not None:
+            return session
+        if self._own_session is None:
+            self._own_session = DbSession()
+        return self._own_session
+
+    @property
+    def conn(self):
+        return self.session.conn
+
+    @property
+    def cursor(self):
+        return self.session.cursor
+
+    def cached_fetch(self, query, params=None, tables=(), one=False):
+        """Read through the shared query cache; `tables` are the tables the result depends on.
+
+        Reads of tables this session has written but not yet committed go
+        straight to the database so the request sees its own changes.
+        """
+        session = self.session
+        if session.dirty_tables.intersection(tables):
+            if params is None:
+                self.cursor.execute(query)
+            else:
+                self.cursor.execute(query, params)
+            return self.cursor.fetchone() if one else self.cursor.fetchall()
+        return cached_query(self.cursor, query, params, tables, one=one, generation=session.generation)
+
+    def identity_fetch(self, table, column, value, loader, keys=('id',), depends=()):
+        """Return the `table` row whose `column` is `value`, calling loader() at most once per request.
+
+        The row is remembered in the request's identity map under every
+        column of `keys`; writes to `table` or to the `depends` tables evict it.
+        """
+        identity = self.session.identity
+        if identity is None:
+            return loader()
+        row = identity.get(table, column, value)
+        if row is not None:
+            return row
+        row = loader()
+        identity.add(table, row, keys, depends)
+        return row
+
+    def fetch_records(self, query, record, params=None, tables=()):
+        """Rows of `query` as `record` instances (see models.records), read with a tuple cursor.
+
+        Goes through the query cache like cached_fetch when `tables` is given.
+        """
+        from database.db import InstrumentedCursor
+        session = self.session
+        cursor = self.conn.cursor(InstrumentedCursor)
+        try:
+            if tables and not session.dirty_tables.intersection(tables):
+                return cached_query(cursor, query, params, tables, generation=session.generation,
+                                    row_factory=record._make)
+            cursor.execute(query, params)
+            return [record._make(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def __del__(self):
+        if getattr(self, '_own_session', None) is not None:
+            self._own_session.close(commit=True)
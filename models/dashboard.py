@@ -0,0 +1,53 @@
+# models/dashboard.py
+from models.base import BaseModel
+
+# One statement, one round trip: a 'total' row of overall counts, then one row
+# per pavilion and one per filiere. Each part aggregates its own table, so the
+# result size grows with pavilions and filieres, never with students.
+STATS_QUERY = """
+    SELECT 'total' AS scope, NULL AS label,
+           COUNT(*) AS students,
+           COALESCE(SUM(CASE WHEN s.type_section = 'IAV' THEN 1 ELSE 0 END), 0) AS iav_students,
+           COALESCE(SUM(CASE WHEN s.type_section = 'APESA' THEN 1 ELSE 0 END), 0) AS apesa_students,
+           (SELECT COUNT(*) FROM filieres) AS filieres,
+           (SELECT COUNT(*) FROM rooms) AS rooms,
+           (SELECT COALESCE(SUM(CASE WHEN r.is_used THEN 1 ELSE 0 END), 0) FROM rooms r) AS occupied_rooms,
+           (SELECT COALESCE(SUM(r.capacity), 0) FROM rooms r) AS capacity
+    FROM students s
+    UNION ALL
+    SELECT 'pavilion', r.pavilion,
+           COALESCE(SUM(r.occupied_count), 0), NULL, NULL, NULL,
+           COUNT(*),
+           COALESCE(SUM(CASE WHEN r.is_used THEN 1 ELSE 0 END), 0),
+           COALESCE(SUM(r.capacity), 0)
+    FROM rooms r
+    GROUP BY r.pavilion
+    UNION ALL
+    SELECT 'filiere', f.name,
+           COUNT(s.id),
+           COALESCE(SUM(CASE WHEN s.type_section = 'IAV' THEN 1 ELSE 0 END), 0),
+           COALESCE(SUM(CASE WHEN s.type_section = 'APESA' THEN 1 ELSE 0 END), 0),
+           NULL, NULL, NULL, NULL
+    FROM filieres f
+    LEFT JOIN students s ON s.filiere_id = f.id
+    GROUP BY f.id, f.name
+    ORDER BY scope, label
+"""
+
+
+class Dashboard(BaseModel):
+    def get_stats(self):
+        """Overall counts plus per-pavilion and per-filiere breakdowns, from one aggregate query.
+
+        Returns (totals row, pavilion rows, filiere rows) as dicts; None and
+        empty lists on error.
+        """
+        try:
+            rows = self.cached_fetch(STATS_QUERY, tables=('students', 'rooms', 'filieres'))
+        except Exception as e:
+            print(f"[ERROR] Dashboard.get_stats: {e}")
+            return None, [], []
+        totals = next((row for row in rows if row['scope'] == 'total'), None)
+        pavilions = [row for row in rows if row['scope'] == 'pavilion']
+        filieres = [row for row in rows if row['scope'] == 'filiere']
+        return totals, pavilions, filieres
@@ -1,33 +1,41 @@
 # models/filiere.py
 
-from database.db import get_connection
 from datetime import datetime
+from models.base import BaseModel
+from models.reference import ReferenceTable
 
-class Filiere:
+# Shared by the whole process; Filiere writes invalidate it through the 'filieres' table version
+FILIERES = ReferenceTable('FiliereRecord', "SELECT id, name, created_at FROM filieres ORDER BY id",
+                          ['id', 'name', 'created_at'], keys=('id', 'name'), tables=('filieres',))
+
+class Filiere(BaseModel):
     def __init__(self):
+        super().__init__()
         self.table_name = 'filieres'
-        self.conn = get_connection()
-        self.cursor = self.conn.cursor()
-
-    def __del__(self):
-        if hasattr(self, 'cursor') and self.cursor:
-            self.cursor.close()
-        if hasattr(self, 'conn') and self.conn:
-            self.conn.close()
 
     def get_all_filieres(self):
-        """Get all filieres from the database."""
+        """Get all filieres (FiliereRecord) from the reference cache."""
         try:
-            self.cursor.execute(f"SELECT * FROM {self.table_name}")
-            return self.cursor.fetchall()
+            return list(FILIERES.rows(self))
         except Exception as e:
             print(f"Error getting all filieres: {e}")
             return []
 
+    def get_filiere_by_name(self, name):
+        """FiliereRecord with this exact name, or None"""
+        try:
+            return FILIERES.get(self, 'name', name)
+        except Exception as e:
+            print(f"Error getting filiere by name: {e}")
+            return None
+
     def get_filiere(self, filiere_id):
+        return self.identity_fetch(self.table_name, 'id', filiere_id, lambda: self._load_filiere(filiere_id))
+
+    def _load_filiere(self, filiere_id):
         try:
-            self.cursor.execute(f"SELECT * FROM {self.table_name} WHERE id = %s", (filiere_id,))
-            return self.cursor.fetchone()
+            return self.cached_fetch(f"SELECT * FROM {self.table_name} WHERE id = %s", (filiere_id,),
+                                     tables=(self.table_name,), one=True)
         except Exception as e:
             print(f"Error getting filiere by ID: {e}")
             return None
@@ -41,14 +49,45 @@ class Filiere:
             query = f"INSERT INTO {self.table_name} (name) VALUES (%s)"
             print(f"Executing SQL: {query} with value: {name}")
             self.cursor.execute(query, (name,))
-            self.conn.commit()
+            self.session.mark_dirty(self.table_name)
+            self.session.commit()
             print(f"Inserted filiere with name: {name}")
             return self.cursor.lastrowid
         except Exception as e:
             print(f"Database error in add_filiere: {e}")
-            self.conn.rollback()
+            self.session.rollback()
             raise Exception(str(e))
 
+    def add_filieres(self, filieres, batch_size=None):
+        """Insert many filieres with batched multi-row INSERTs.
+
+        Returns one outcome per input row: {'index', 'success', 'error'}.
+        """
+        from database.db import bulk_insert
+        outcomes = [None] * len(filieres)
+        prepared = []
+        positions = []
+        for i, data in enumerate(filieres):
+            name = data.get('name') if isinstance(data, dict) else data
+            if not name or str(name).lower() == 'name':
+                outcomes[i] = {'index': i, 'success': False, 'error': 'Missing or invalid field: name'}
+                continue
+            prepared.append((name,))
+            positions.append(i)
+
+        try:
+            results = bulk_insert(self.table_name, ['name'], prepared, batch_size=batch_size, conn=self.conn)
+            self.session.mark_dirty(self.table_name)
+            self.session.commit()
+        except Exception as e:
+            print(f"Database error in add_filieres: {e}")
+            self.session.rollback()
+            results = [{'success': False, 'error': str(e)} for _ in prepared]
+
+        for position, result in zip(positions, results):
+            outcomes[position] = {'index': position, 'success': result['success'], 'error': result['error']}
+        return outcomes
+
     def update_filiere(self, filiere_id, data):
         try:
             name = data.get('name') if isinstance(data, dict) else data
@@ -56,21 +95,24 @@ class Filiere:
                 raise Exception('Missing or invalid field: name')
             query = f"UPDATE {self.table_name} SET name = %s WHERE id = %s"
             self.cursor.execute(query, (name, filiere_id))
-            self.conn.commit()
+            self.session.mark_dirty(self.table_name)
+            self.session.commit()
             return True
         except Exception as e:
             print(f"Error updating filiere: {e}")
-            self.conn.rollback()
+            self.session.rollback()
             raise Exception(str(e))
 
     def delete_filiere(self, filiere_id):
         try:
             self.cursor.execute(f"DELETE FROM {self.table_name} WHERE id = %s", (filiere_id,))
-            self.conn.commit()
+            # ON DELETE SET NULL clears students.filiere_id too
+            self.session.mark_dirty(self.table_name, 'students')
+            self.session.commit()
             return True
         except Exception as e:
             print(f"Error deleting filiere: {e}")
-            self.conn.rollback()
+            self.session.rollback()
             raise Exception(str(e))
 
 
@@ -0,0 +1,55 @@
+# models/records.py
+"""Compact read-only rows for list views and exports.
+
+A record is a namedtuple built straight from a tuple cursor row: no per-row
+dict, one slot per selected column. Records also answer the dict-style reads
+the controllers, templates and exporters already use (`row['nom']`,
+`row.get('num_chambre')`, `row.keys()`), so they can stand in for dict rows
+wherever those rows are only read.
+"""
+from collections import namedtuple
+
+
+class RecordMixin:
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return tuple.__getitem__(self, self._index[key])
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self._fields, self)
+
+    def to_dict(self):
+        return dict(zip(self._fields, self))
+
+
+def record_type(name, fields):
+    """Create a record class with the given field names"""
+    base = namedtuple(name, fields)
+    return type(name, (RecordMixin, base), {
+        '__slots__': (),
+        '_index': {field: i for i, field in enumerate(base._fields)},
+    })
+
+
+def projection_columns(projection):
+    """SELECT list for a projection given as [(field, sql expression)]"""
+    return ', '.join(f"{expression} AS {field}" for field, expression in projection)
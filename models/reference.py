@@ -0,0 +1,82 @@
+# models/reference.py
+"""Process-wide snapshots of small reference tables (filieres, room metadata).
+
+Forms and imports read these lists on almost every request, so each table is
+loaded once into immutable records with dict indexes (by id, name, room
+number) and shared by every request of the process. A snapshot stays valid
+until one of its version tables is invalidated in the query cache, which
+happens when a write marked with mark_dirty() commits, or until
+DB_REFERENCE_TTL expires; the next read then reloads it.
+
+Like the query cache, invalidation is per process: other worker processes
+pick up a change when their snapshot expires.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from database.cache import query_cache
+from database.db import DB_CACHE_ENABLED, DB_REFERENCE_TTL
+from models.records import record_type
+
+_Snapshot = namedtuple('_Snapshot', ['generation', 'expires_at', 'rows', 'indexes'])
+
+
+class ReferenceTable:
+    """One reference table: `query` selects `fields`, indexed by each column of `keys`.
+
+    `tables` are the cache version tables that outdate the snapshot.
+    """
+
+    def __init__(self, name, query, fields, keys=('id',), tables=()):
+        self.query = query
+        self.record = record_type(name, fields)
+        self.keys = tuple(keys)
+        self.tables = tuple(tables)
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def rows(self, model):
+        """Every record, in query order"""
+        return self._current(model).rows
+
+    def get(self, model, key, value):
+        """The record whose `key` column is `value`, or None"""
+        return self._current(model).indexes[key].get(value)
+
+    def index(self, model, key):
+        """{value: record} for the `key` column; do not modify it"""
+        return self._current(model).indexes[key]
+
+    def _fresh(self, snapshot):
+        return (snapshot is not None and time.monotonic() < snapshot.expires_at
+                and not query_cache.changed_since(self.tables, snapshot.generation))
+
+    def _current(self, model):
+        session = model.session
+        # A transaction that wrote the table must see its own changes
+        if not DB_CACHE_ENABLED or session.dirty_tables.intersection(self.tables):
+            return self._load(model)
+        snapshot = self._snapshot
+        if self._fresh(snapshot):
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if not self._fresh(snapshot):
+                snapshot = self._load(model)
+                # A write committed while loading leaves the snapshot for this request only
+                if not query_cache.changed_since(self.tables, snapshot.generation):
+                    self._snapshot = snapshot
+            return snapshot
+
+    def _load(self, model):
+        from database.db import InstrumentedCursor
+        cursor = model.conn.cursor(InstrumentedCursor)
+        generation = model.session.generation
+        try:
+            cursor.execute(self.query)
+            rows = tuple(self.record._make(row) for row in cursor.fetchall())
+        finally:
+            cursor.close()
+        indexes = {key: {getattr(row, key): row for row in rows} for key in self.keys}
+        return _Snapshot(generation, time.monotonic() + DB_REFERENCE_TTL, rows, indexes)
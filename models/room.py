@@ -1,98 +1,186 @@
 # models/room.py
-from database.db import get_connection
 from datetime import datetime
-import pymysql
+from database.db import is_sqlite
+from models.base import BaseModel
+from models.records import projection_columns, record_type
+from models.reference import ReferenceTable
+from models.student_index import student_index
 
-class Room:
-    def __init__(self):
-        self.table_name = 'rooms'
-        self.conn = get_connection()
-        self.cursor = self.conn.cursor(pymysql.cursors.DictCursor)
+# The room list views' columns, read as compact records (see models.student)
+LIST_PROJECTION = [('id', 'r.id'), ('room_number', 'r.room_number'), ('pavilion', 'r.pavilion'),
+                   ('room_type', 'r.room_type'), ('capacity', 'r.capacity'), ('is_used', 'r.is_used'),
+                   ('used_capacity', 'r.occupied_count')]
+RoomListRecord = record_type('RoomListRecord', [field for field, _ in LIST_PROJECTION])
+
+# Room metadata rarely changes, unlike occupancy: only the writes below that add, rename,
+# retype or delete rooms mark this version table, so assignments keep the snapshot warm
+ROOM_METADATA_TABLE = 'room_metadata'
+ROOM_METADATA = ReferenceTable('RoomMetadataRecord', """
+    SELECT id, room_number, pavilion, room_type, capacity FROM rooms ORDER BY room_number
+""", ['id', 'room_number', 'pavilion', 'room_type', 'capacity'], keys=('id', 'room_number'),
+    tables=(ROOM_METADATA_TABLE,))
 
-    def __del__(self):
-        if hasattr(self, 'cursor') and self.cursor:
-            self.cursor.close()
-        if hasattr(self, 'conn') and self.conn:
-            self.conn.close()
+class Room(BaseModel):
+    def __init__(self, session=None):
+        super().__init__(session)
+        self.table_name = 'rooms'
 
-    def get_all_rooms(self):
-        """Get all rooms from the database."""
+    def get_all_rooms(self, projection='full'):
+        """Get all rooms from the database: dict rows ('full') or RoomListRecord ('list')."""
+        if projection not in ('full', 'list'):
+            raise ValueError(f"Unknown room projection: {projection}")
         try:
-            self.cursor.execute("""
-                SELECT r.*, 
-                       (SELECT COUNT(*) FROM students s WHERE s.num_chambre = r.room_number) as used_capacity
+            if projection == 'list':
+                return self.fetch_records(f"""
+                    SELECT {projection_columns(LIST_PROJECTION)}
+                    FROM rooms r
+                    ORDER BY r.room_number
+                """, RoomListRecord, tables=('rooms',))
+            return self.cached_fetch("""
+                SELECT r.*, r.occupied_count as used_capacity
                 FROM rooms r
                 ORDER BY r.room_number
-            """)
-            return self.cursor.fetchall()
+            """, tables=('rooms',))
         except Exception as e:
             print(f"[ERROR] get_all_rooms: {e}")
             return []
 
+    def get_room_metadata(self):
+        """Number, pavilion, type and capacity of every room (RoomMetadataRecord), from the reference cache"""
+        try:
+            return list(ROOM_METADATA.rows(self))
+        except Exception as e:
+            print(f"[ERROR] get_room_metadata: {e}")
+            return []
+
     def get_room_by_number(self, room_number):
+        return self.identity_fetch(self.table_name, 'room_number', room_number,
+                                   lambda: self._load_room('room_number', room_number), keys=('id', 'room_number'))
+
+    def _load_room(self, column, value):
         try:
-            self.cursor.execute("""
-                SELECT r.*, 
-                       (SELECT COUNT(*) FROM students s WHERE s.num_chambre = r.room_number) as used_capacity
+            return self.cached_fetch(f"""
+                SELECT r.*, r.occupied_count as used_capacity
                 FROM rooms r
-                WHERE r.room_number = %s
-            """, (room_number,))
-            return self.cursor.fetchone()
+                WHERE r.{column} = %s
+            """, (value,), tables=('rooms',), one=True)
         except Exception as e:
-            print(f"[ERROR] get_room_by_number: {e}")
+            print(f"[ERROR] get_room by {column}: {e}")
             return None
 
+    def get_room_ids(self, room_numbers):
+        """Map room numbers to room ids in one query; unknown numbers are left out"""
+        room_numbers = sorted({n for n in room_numbers if n})
+        if not room_numbers:
+            return {}
+        self.cursor.execute(f"""
+            SELECT id, room_number FROM rooms
+            WHERE room_number IN ({', '.join(['%s'] * len(room_numbers))})
+        """, tuple(room_numbers))
+        return {row['room_number']: row['id'] for row in self.cursor.fetchall()}
+
+    def link_students(self, room_numbers):
+        """Point students whose num_chambre names one of these rooms at the room's id"""
+        room_numbers = sorted({n for n in room_numbers if n})
+        if not room_numbers:
+            return
+        self.cursor.execute(f"""
+            UPDATE students SET room_id = (SELECT r.id FROM rooms r WHERE r.room_number = students.num_chambre)
+            WHERE room_id IS NULL AND num_chambre IN ({', '.join(['%s'] * len(room_numbers))})
+        """, tuple(room_numbers))
+        if self.cursor.rowcount:
+            self.session.mark_dirty('students')
+
     def get_room(self, room_id):
-        try:
-            self.cursor.execute(f"SELECT * FROM {self.table_name} WHERE id = %s", (room_id,))
-            return self.cursor.fetchone()
-        except Exception as e:
-            print(f"Error getting room by ID: {e}")
-            return None
+        return self.identity_fetch(self.table_name, 'id', room_id,
+                                   lambda: self._load_room('id', room_id), keys=('id', 'room_number'))
+
+    def _prepare_room_data(self, data):
+        """Validate a room dict and derive its capacity from the room type"""
+        if isinstance(data, dict):
+            room_number = data.get('room_number')
+            pavilion = data.get('pavilion')
+            room_type = data.get('room_type')
+            # Normalize room_type
+            if isinstance(room_type, str):
+                room_type = room_type.strip().lower()
+            
+            # Strict room type validation
+            if room_type not in ['single', 'double', 'triple']:
+                raise Exception(f"Type de chambre invalide: {room_type}. Doit être 'single', 'double' ou 'triple'")
+            
+            # Set capacity based on room_type
+            if room_type == 'single':
+                capacity = 1
+            elif room_type == 'double':
+                capacity = 2
+            elif room_type == 'triple':
+                capacity = 3
+            
+            # Override any provided capacity to match room type
+            data['capacity'] = capacity
+        else:
+            raise Exception('Invalid data format for room')
+            
+        if not all([room_number, pavilion, room_type]):
+            raise Exception('Missing required fields')
+        return room_number, pavilion, room_type, capacity
 
     def add_room(self, data):
         try:
-            if isinstance(data, dict):
-                room_number = data.get('room_number')
-                pavilion = data.get('pavilion')
-                room_type = data.get('room_type')
-                # Normalize room_type
-                if isinstance(room_type, str):
-                    room_type = room_type.strip().lower()
-                
-                # Strict room type validation
-                if room_type not in ['single', 'double', 'triple']:
-                    raise Exception(f"Type de chambre invalide: {room_type}. Doit être 'single', 'double' ou 'triple'")
-                
-                # Set capacity based on room_type
-                if room_type == 'single':
-                    capacity = 1
-                elif room_type == 'double':
-                    capacity = 2
-                elif room_type == 'triple':
-                    capacity = 3
-                
-                # Override any provided capacity to match room type
-                data['capacity'] = capacity
-                
-                print(f"add_room called with: {data} (parsed: room_number={room_number}, pavilion={pavilion}, room_type={room_type}, capacity={capacity})")
-            else:
-                raise Exception('Invalid data format for room')
-                
-            if not all([room_number, pavilion, room_type]):
-                raise Exception('Missing required fields')
+            room_number, pavilion, room_type, capacity = self._prepare_room_data(data)
+            print(f"add_room called with: {data} (parsed: room_number={room_number}, pavilion={pavilion}, room_type={room_type}, capacity={capacity})")
                 
             query = f"INSERT INTO {self.table_name} (room_number, pavilion, room_type, capacity, is_used) VALUES (%s, %s, %s, %s, 0)"
             print(f"Executing SQL: {query} with values: {room_number}, {pavilion}, {room_type}, {capacity}")
             self.cursor.execute(query, (room_number, pavilion, room_type, capacity))
-            self.conn.commit()
+            room_id = self.cursor.lastrowid
+            # Students may already be assigned to this room number
+            self.link_students([room_number])
+            self.reconcile_occupancy([room_number])
+            self.session.mark_dirty(self.table_name, ROOM_METADATA_TABLE)
+            self.session.commit()
             print(f"Inserted room with room_number: {room_number}")
-            return self.cursor.lastrowid
+            return room_id
         except Exception as e:
             print(f"Database error in add_room: {e}")
-            self.conn.rollback()
+            self.session.rollback()
             raise Exception(str(e))
 
+    def add_rooms(self, rooms, batch_size=None):
+        """Insert many rooms with batched multi-row INSERTs.
+
+        Returns one outcome per input row: {'index', 'success', 'error'}.
+        """
+        from database.db import bulk_insert
+        outcomes = [None] * len(rooms)
+        prepared = []
+        positions = []
+        for i, data in enumerate(rooms):
+            try:
+                prepared.append(self._prepare_room_data(dict(data)) + (0,))
+                positions.append(i)
+            except Exception as e:
+                outcomes[i] = {'index': i, 'success': False, 'error': str(e)}
+
+        try:
+            results = bulk_insert(self.table_name, ['room_number', 'pavilion', 'room_type', 'capacity', 'is_used'],
+                                  prepared, batch_size=batch_size, conn=self.conn)
+            # Students may already be assigned to the new room numbers
+            added = [row[0] for row, result in zip(prepared, results) if result['success']]
+            self.link_students(added)
+            self.reconcile_occupancy(added)
+            self.session.mark_dirty(self.table_name, ROOM_METADATA_TABLE)
+            self.session.commit()
+        except Exception as e:
+            print(f"Database error in add_rooms: {e}")
+            self.session.rollback()
+            results = [{'success': False, 'error': str(e)} for _ in prepared]
+
+        for position, result in zip(positions, results):
+            outcomes[position] = {'index': position, 'success': result['success'], 'error': result['error']}
+        return outcomes
+
     def update_room(self, room_id, data):
         try:
             if isinstance(data, dict):
@@ -118,116 +206,191 @@ class Room:
                 
                 # Override any provided capacity to match room type
                 data['capacity'] = capacity
-                is_used = data.get('is_used', 0)
             else:
                 raise Exception('Invalid data format for room')
                 
             if not all([room_number, pavilion, room_type]):
                 raise Exception('Missing required fields')
                 
-            query = f"UPDATE {self.table_name} SET room_number = %s, pavilion = %s, room_type = %s, capacity = %s, is_used = %s WHERE id = %s"
-            self.cursor.execute(query, (room_number, pavilion, room_type, capacity, is_used, room_id))
-            self.conn.commit()
+            # is_used follows the occupancy counter; students of a renamed room follow it through room_id
+            query = f"UPDATE {self.table_name} SET room_number = %s, pavilion = %s, room_type = %s, capacity = %s WHERE id = %s"
+            self.cursor.execute(query, (room_number, pavilion, room_type, capacity, room_id))
+            self.cursor.execute("UPDATE students SET num_chambre = %s WHERE room_id = %s AND num_chambre <> %s",
+                                (room_number, room_id, room_number))
+            if self.cursor.rowcount:
+                self.session.mark_dirty('students')
+            self.link_students([room_number])
+            self.reconcile_occupancy([room_number])
+            self.session.mark_dirty(self.table_name, ROOM_METADATA_TABLE)
+            self.session.commit()
             return True
         except Exception as e:
             print(f"Error updating room: {e}")
-            self.conn.rollback()
+            self.session.rollback()
             raise Exception(str(e))
 
+    def _release_students(self, condition, value):
+        """Clear the room of the students matching `condition` and log their release"""
+        from models.room_history import RoomHistory
+        self.cursor.execute(f"SELECT id, num_chambre, annee_universitaire FROM students WHERE {condition}", (value,))
+        students = self.cursor.fetchall()
+        if students:
+            self.cursor.execute(f"UPDATE students SET num_chambre = NULL WHERE {condition}", (value,))
+            RoomHistory(self.session).record_releases(students)
+
     def delete_room(self, room_id):
         try:
+            # room_id is cleared by ON DELETE SET NULL; the display number goes with it
+            self._release_students("room_id = %s", room_id)
             self.cursor.execute(f"DELETE FROM {self.table_name} WHERE id = %s", (room_id,))
-            self.conn.commit()
+            self.session.mark_dirty(self.table_name, ROOM_METADATA_TABLE, 'students')
+            self.session.commit()
             return True
         except Exception as e:
             print(f"Error deleting room: {e}")
-            self.conn.rollback()
+            self.session.rollback()
             raise Exception(str(e))
 
     def delete_room_by_number(self, room_number):
         try:
+            self._release_students("num_chambre = %s", room_number)
             self.cursor.execute(f"DELETE FROM {self.table_name} WHERE room_number = %s", (room_number,))
-            self.conn.commit()
+            self.session.mark_dirty(self.table_name, ROOM_METADATA_TABLE, 'students')
+            self.session.commit()
             return True
         except Exception as e:
             print(f"Error deleting room by number: {e}")
-            self.conn.rollback()
+            self.session.rollback()
             raise Exception(str(e))
 
     def get_student_count_in_room(self, room_number):
         """Return the number of students assigned to a room."""
-        from database.db import execute_query
-        query = "SELECT COUNT(*) as count FROM students WHERE num_chambre = %s"
-        result = execute_query(query, (room_number,))
-        if isinstance(result, list) and result:
-            return result[0]['count']
-        return 0
+        self.cursor.execute("SELECT occupied_count FROM rooms WHERE room_number = %s", (room_number,))
+        result = self.cursor.fetchone()
+        return result['occupied_count'] if result else 0
 
-    def set_room_used_status(self, room_number):
-        """Update room's used status based on current student count"""
+    def adjust_occupancy(self, room_id, delta):
+        """Add `delta` students to the occupied_count of room `room_id` and refresh is_used.
+
+        The room is the one students.room_id points to, as reconcile_occupancy
+        counts them. Runs in the current transaction without committing, so
+        callers update the counter in the same transaction as the student write.
+        """
+        if not room_id or not delta:
+            return
+        # is_used is assigned first: MySQL evaluates SET left to right, SQLite against the old row
+        self.cursor.execute("""
+            UPDATE rooms
+            SET is_used = (occupied_count + %s >= capacity),
+                occupied_count = occupied_count + %s,
+                updated_at = NOW()
+            WHERE id = %s
+        """, (delta, delta, room_id))
+        self.session.mark_dirty(self.table_name)
+
+    def reconcile_occupancy(self, room_numbers=None):
+        """Recount occupied_count and is_used from students for the given rooms (default: all).
+
+        One set-based UPDATE joined to a count of students grouped by room_id,
+        whatever the number of rooms. Repairs any drift of the denormalized
+        counter. Runs in the current transaction without committing; returns
+        the number of rooms whose values changed.
+        """
+        room_filter = ''
+        student_filter = ''
+        params = ()
+        if room_numbers is not None:
+            room_ids = sorted(self.get_room_ids(room_numbers).values())
+            if not room_ids:
+                return 0
+            placeholders = ', '.join(['%s'] * len(room_ids))
+            student_filter = f"WHERE room_id IN ({placeholders})"
+            room_filter = f"AND r.id IN ({placeholders})"
+            params = tuple(room_ids)
+
+        if is_sqlite():
+            # SQLite has UPDATE ... FROM (inner join) rather than MySQL's multi-table UPDATE
+            self.cursor.execute(f"""
+                UPDATE rooms SET
+                    occupied_count = c.n,
+                    is_used = (c.n >= rooms.capacity)
+                FROM (
+                    SELECT r.id, COUNT(s.id) AS n
+                    FROM rooms r
+                    LEFT JOIN students s ON s.room_id = r.id
+                    WHERE 1 = 1 {room_filter}
+                    GROUP BY r.id
+                ) AS c
+                WHERE c.id = rooms.id
+                  AND (rooms.occupied_count <> c.n OR rooms.is_used <> (c.n >= rooms.capacity))
+            """, params or None)
+        else:
+            self.cursor.execute(f"""
+                UPDATE rooms r
+                LEFT JOIN (
+                    SELECT room_id, COUNT(*) AS n
+                    FROM students
+                    {student_filter}
+                    GROUP BY room_id
+                ) AS c ON c.room_id = r.id
+                SET r.occupied_count = COALESCE(c.n, 0),
+                    r.is_used = (COALESCE(c.n, 0) >= r.capacity)
+                WHERE (r.occupied_count <> COALESCE(c.n, 0) OR r.is_used <> (COALESCE(c.n, 0) >= r.capacity))
+                  {room_filter}
+            """, (params + params) or None)
+        fixed = self.cursor.rowcount
+        if fixed:
+            self.session.mark_dirty(self.table_name)
+            print(f"[INFO] Room occupancy recomputed for {fixed} room(s)")
+        return fixed
+
+    def set_rooms_used_status(self, room_numbers=None):
+        """Recount occupancy and is_used for many rooms (default: all) in one statement and commit"""
         try:
-            # Get room details
-            self.cursor.execute("""
-                SELECT r.*, COUNT(s.id) as student_count
-                FROM rooms r
-                LEFT JOIN students s ON r.room_number = s.num_chambre
-                WHERE r.room_number = %s
-                GROUP BY r.room_number
-            """, (room_number,))
-            room = self.cursor.fetchone()
-            
-            if not room:
-                print(f"[ERROR] Room {room_number} not found")
-                return False
-            
-            # Calculate if room is used
-            student_count = room['student_count'] if room['student_count'] is not None else 0
-            capacity = room['capacity']
-            is_used = int(student_count) == int(capacity)
-            
-            # Update room status
-            self.cursor.execute("""
-                UPDATE rooms 
-                SET is_used = %s,
-                    updated_at = NOW()
-                WHERE room_number = %s
-            """, (is_used, room_number))
-            self.conn.commit()
-            
-            print(f"[INFO] Room {room_number} status updated: {is_used} (students: {student_count}/{capacity})")
-            return True
+            fixed = self.reconcile_occupancy(room_numbers)
+            self.session.commit()
+            return fixed
         except Exception as e:
-            print(f"[ERROR] set_room_used_status: {e}")
-            self.conn.rollback()
-            return False
+            print(f"[ERROR] set_rooms_used_status: {e}")
+            self.session.rollback()
+            return None
+
+    def set_room_used_status(self, room_number):
+        """Recount a room's occupancy from its students and commit"""
+        return self.set_rooms_used_status([room_number]) is not None
 
     def get_room_by_student(self, student_id):
         """Get the room number assigned to a student."""
-        from database.db import execute_query
-        query = "SELECT num_chambre FROM students WHERE id = %s"
-        result = execute_query(query, (student_id,))
-        if isinstance(result, list) and result and result[0].get('num_chambre'):
-            return result[0]['num_chambre']
+        self.cursor.execute("SELECT num_chambre FROM students WHERE id = %s", (student_id,))
+        result = self.cursor.fetchone()
+        if result and result.get('num_chambre'):
+            return result['num_chambre']
         return None
 
     def clear_student_room(self, student_id):
         """Unassign a student from their room."""
-        update_student_query = "UPDATE students SET num_chambre = 'no room' WHERE id = %s"
+        from models.room_history import RoomHistory
+        self.cursor.execute("SELECT id, num_chambre, room_id, annee_universitaire FROM students WHERE id = %s",
+                            (student_id,))
+        student = self.cursor.fetchone()
+        update_student_query = "UPDATE students SET num_chambre = NULL, room_id = NULL WHERE id = %s"
         self.cursor.execute(update_student_query, (student_id,))
-        self.conn.commit()
+        self.adjust_occupancy(student['room_id'] if student else None, -1)
+        if student:
+            RoomHistory(self.session).record_releases([student])
+        student_index.touch(self.session, [student_id])
+        self.session.mark_dirty('students')
+        self.session.commit()
 
     def get_available_rooms(self):
         """Get list of available rooms"""
         try:
-            self.cursor.execute("""
-                SELECT r.*, COUNT(s.id) as current_students
+            return self.cached_fetch("""
+                SELECT r.*, r.occupied_count as current_students
                 FROM rooms r
-                LEFT JOIN students s ON r.room_number = s.num_chambre
-                GROUP BY r.room_number
-                HAVING current_students < r.capacity OR current_students IS NULL
+                WHERE r.occupied_count < r.capacity
                 ORDER BY r.room_number
-            """)
-            return self.cursor.fetchall()
+            """, tables=('rooms',))
         except Exception as e:
             print(f"[ERROR] get_available_rooms: {e}")
             return []
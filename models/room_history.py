@@ -1,28 +1,107 @@
-from database.db import get_connection, execute_query
+import re
 from datetime import datetime
+from models.base import BaseModel
 
-class RoomHistory:
-    def __init__(self):
+ASSIGN = 'assign'
+RELEASE = 'release'
+
+
+def academic_year(annee_universitaire):
+    """History year of an academic year such as '2024/2025': its first calendar year"""
+    if isinstance(annee_universitaire, int):
+        return annee_universitaire
+    match = re.search(r'\d{4}', str(annee_universitaire or ''))
+    return int(match.group(0)) if match else datetime.now().year
+
+
+class RoomHistory(BaseModel):
+    """Append-only log of room assignments, written by the student and room models.
+
+    Rows are (student_id, room_number, year, action) where action is 'assign'
+    when the student enters the room or starts a new academic year in it and
+    'release' when they leave it. Rows are never updated or deleted, and keep
+    the room number of the time and the ids of deleted students.
+    """
+
+    def __init__(self, session=None):
+        super().__init__(session)
         self.table_name = 'room_history'
-        self.conn = get_connection()
-        self.cursor = self.conn.cursor()
 
-    def __del__(self):
-        if hasattr(self, 'cursor') and self.cursor:
-            self.cursor.close()
-        if hasattr(self, 'conn') and self.conn:
-            self.conn.close()
+    def record(self, events, batch_size=None):
+        """Append (student_id, room_number, year, action) events with batched multi-row INSERTs.
+
+        Runs in the current transaction without committing, so history is
+        written together with the change it describes.
+        """
+        from database.db import bulk_insert
+        events = [event for event in events if event[1]]
+        if not events:
+            return
+        results = bulk_insert(self.table_name, ['student_id', 'room_number', 'year', 'action'], events,
+                              batch_size=batch_size, conn=self.conn)
+        failed = [result['error'] for result in results if not result['success']]
+        if failed:
+            raise Exception(f"room_history: {len(failed)} event(s) not recorded: {failed[0]}")
+        self.session.mark_dirty(self.table_name)
+
+    def record_transition(self, student_id, before, after):
+        """Record a student's move from `before` to `after`, each (room_number, annee_universitaire)"""
+        old_room, old_year = before[0], academic_year(before[1])
+        new_room, new_year = after[0], academic_year(after[1])
+        events = []
+        if old_room and old_room != new_room:
+            events.append((student_id, old_room, old_year, RELEASE))
+        if new_room and (new_room != old_room or new_year != old_year):
+            events.append((student_id, new_room, new_year, ASSIGN))
+        self.record(events)
+
+    def record_releases(self, students):
+        """Record that students (rows with id, num_chambre, annee_universitaire) left their rooms"""
+        self.record([(s['id'], s['num_chambre'], academic_year(s['annee_universitaire']), RELEASE)
+                     for s in students])
+
+    def record_year_start(self, annee_universitaire):
+        """Assign every housed student not yet in `annee_universitaire` to their room for that year.
+
+        One INSERT ... SELECT; call it before students.annee_universitaire is updated.
+        """
+        self.cursor.execute(f"""
+            INSERT INTO {self.table_name} (student_id, room_number, year, action)
+            SELECT id, num_chambre, %s, %s FROM students
+            WHERE num_chambre IS NOT NULL AND annee_universitaire <> %s
+        """, (academic_year(annee_universitaire), ASSIGN, annee_universitaire))
+        if self.cursor.rowcount:
+            self.session.mark_dirty(self.table_name)
+        return self.cursor.rowcount
 
     def add_history(self, student_id, room_number, year=None):
         """Add a room assignment to the history table."""
-        if not year:
-            year = datetime.now().year
-        query = f"INSERT INTO {self.table_name} (student_id, room_number, year) VALUES (%s, %s, %s)"
-        self.cursor.execute(query, (student_id, room_number, year))
-        self.conn.commit()
+        query = f"INSERT INTO {self.table_name} (student_id, room_number, year, action) VALUES (%s, %s, %s, %s)"
+        self.cursor.execute(query, (student_id, room_number, academic_year(year), ASSIGN))
+        self.session.mark_dirty(self.table_name)
+        self.session.commit()
         return self.cursor.lastrowid
 
     def get_history_for_student(self, student_id):
-        query = f"SELECT * FROM {self.table_name} WHERE student_id = %s ORDER BY year DESC"
+        """Events of a student, most recent first"""
+        query = f"""
+            SELECT id, student_id, room_number, year, action, created_at
+            FROM {self.table_name}
+            WHERE student_id = %s
+            ORDER BY year DESC, id DESC
+        """
         self.cursor.execute(query, (student_id,))
         return self.cursor.fetchall()
+
+    def get_room_occupants(self, room_number, year):
+        """Students who lived in a room during an academic year, including since deleted ones"""
+        self.cursor.execute(f"""
+            SELECT h.student_id, s.nom, s.prenom, s.matricule,
+                   MIN(h.created_at) AS first_event, MAX(h.created_at) AS last_event
+            FROM {self.table_name} h
+            LEFT JOIN students s ON s.id = h.student_id
+            WHERE h.year = %s AND h.room_number = %s
+            GROUP BY h.student_id, s.nom, s.prenom, s.matricule
+            ORDER BY first_event
+        """, (academic_year(year), room_number))
+        return self.cursor.fetchall()
@@ -0,0 +1,71 @@
+# models/search.py
+"""Accent-insensitive keyword search over students.
+
+Every student has a student_search row whose `terms` hold its nom, prenom,
+matricule and cin folded to lowercase ASCII words, each preceded by a space
+("Benaïssa", "Hélène" -> " benaissa helene"). The Student model rewrites the
+row whenever one of those columns changes. Keywords are folded the same way,
+so 'helene' finds 'Hélène' whatever the collation.
+
+On MySQL the terms are matched through a FULLTEXT ngram index (migration
+0009), which finds words containing the keyword without scanning the
+students table; SQLite matches them with LIKE.
+"""
+import re
+import unicodedata
+
+from database.db import is_sqlite
+
+SEARCH_COLUMNS = ('nom', 'prenom', 'matricule', 'cin')
+# Characters per token of MySQL's ngram parser (ngram_token_size); shorter words are not indexed
+NGRAM_SIZE = 2
+
+_LIGATURES = str.maketrans({'œ': 'oe', 'æ': 'ae'})
+_NON_WORD_RE = re.compile(r'[^0-9a-z]+')
+
+
+def fold(text):
+    """The words of `text` in lowercase ASCII, accents and punctuation removed"""
+    text = unicodedata.normalize('NFKD', str(text or '').casefold().translate(_LIGATURES))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _NON_WORD_RE.sub(' ', text).split()
+
+
+def search_terms(student):
+    """student_search.terms of a student row or form"""
+    return ''.join(f" {word}" for column in SEARCH_COLUMNS for word in fold(student.get(column)))
+
+
+def search_join(keyword):
+    """How to restrict students s to the matches of `keyword`, best first.
+
+    Returns (JOIN clause of student_search ss, WHERE condition, its params,
+    relevance expression, its params), or None if the keyword has no word
+    to search. Every word of the keyword must appear in a match's terms.
+    """
+    words = fold(keyword)
+    if not words:
+        return None
+    conditions = []
+    params = []
+    if is_sqlite():
+        conditions = ["ss.terms LIKE %s"] * len(words)
+        params = [f"%{word}%" for word in words]
+        # Words that start a term rank above words found inside one
+        score = " + ".join(["(CASE WHEN ss.terms LIKE %s THEN 1 ELSE 0 END)"] * len(words))
+        score_params = [f"% {word}%" for word in words]
+    else:
+        indexed = [word for word in words if len(word) >= NGRAM_SIZE]
+        score, score_params = "0", []
+        if indexed:
+            # Quoted words are ngram phrases: they match inside longer words
+            against = ' '.join(f'+"{word}"' for word in indexed)
+            conditions.append("MATCH(ss.terms) AGAINST (%s IN BOOLEAN MODE)")
+            params.append(against)
+            score, score_params = "MATCH(ss.terms) AGAINST (%s IN BOOLEAN MODE)", [against]
+        for word in words:
+            if len(word) < NGRAM_SIZE:
+                conditions.append("ss.terms LIKE %s")
+                params.append(f"%{word}%")
+    join = "JOIN student_search ss ON ss.student_id = s.id"
+    return join, f"({' AND '.join(conditions)})", tuple(params), f"({score})", tuple(score_params)
@@ -1,44 +1,334 @@
 from werkzeug.utils import secure_filename
+import base64
+import json
 import os
 import uuid
 from datetime import datetime
-import pymysql
 
-from database.db import get_connection
+from models.base import BaseModel
+from models.records import projection_columns, record_type
+from models.search import SEARCH_COLUMNS, search_join, search_terms
+from models.student_index import student_index
 
-class Student:
+# Column sets of the student list reads, as (field, expression) over students s,
+# filieres f and rooms r. 'full' is every column as dict rows; the others are
+# read as compact records holding only what their views use.
+PROJECTIONS = {
+    'list': [('id', 's.id'), ('matricule', 's.matricule'), ('nom', 's.nom'), ('prenom', 's.prenom'),
+             ('cin', 's.cin'), ('filiere_id', 's.filiere_id'), ('filiere_name', 'f.name'),
+             ('type_section', 's.type_section'), ('num_chambre', 's.num_chambre'), ('pavilion', 'r.pavilion'),
+             ('created_at', 's.created_at')],
+    # The desktop search table: students without a room show 'Aucune' as room and pavilion
+    'display': [('id', 's.id'), ('matricule', 's.matricule'), ('nom', 's.nom'), ('prenom', 's.prenom'),
+                ('filiere_name', 'f.name'), ('type_section', 's.type_section'),
+                ('num_chambre', "COALESCE(NULLIF(s.num_chambre, ''), 'Aucune')"),
+                ('pavilion', "CASE WHEN s.num_chambre IS NULL OR s.num_chambre = '' THEN 'Aucune' "
+                             "ELSE COALESCE(r.pavilion, '') END")],
+    'export': [('matricule', 's.matricule'), ('nom', 's.nom'), ('prenom', 's.prenom'),
+               ('type_section', 's.type_section'), ('annee_universitaire', 's.annee_universitaire'),
+               ('num_chambre', 's.num_chambre')],
+}
+RECORDS = {
+    'list': record_type('StudentListRecord', [field for field, _ in PROJECTIONS['list']]),
+    'display': record_type('StudentDisplayRecord', [field for field, _ in PROJECTIONS['display']]),
+    'export': record_type('StudentExportRecord', [field for field, _ in PROJECTIONS['export']]),
+}
+FULL_COLUMNS = 's.*, f.name as filiere_name, r.pavilion'
+
+# Sort orders of the student list as (students column, direction); s.id breaks ties
+# so the order is total, which keyset pages rely on (see 0008_student_sort_keys)
+SORTS = {
+    'recent': ('created_at', 'DESC'),
+    'nom': ('nom', 'ASC'),
+    'matricule': ('matricule', 'ASC'),
+}
+
+
+def _projection(projection):
+    """Return (SELECT list, record class or None for dict rows) of a projection name"""
+    if projection == 'full':
+        return FULL_COLUMNS, None
+    if projection not in PROJECTIONS:
+        raise ValueError(f"Unknown student projection: {projection}")
+    return projection_columns(PROJECTIONS[projection]), RECORDS[projection]
+
+
+def _sort(sort):
+    if sort not in SORTS:
+        raise ValueError(f"Unknown student sort: {sort}")
+    return SORTS[sort]
+
+
+def _encode_cursor(sort, direction, row):
+    """Opaque page cursor: the sort key and id of `row`, read 'next' (after it) or 'prev' (before it)"""
+    value = row[SORTS[sort][0]]
+    if isinstance(value, datetime):
+        value = value.strftime('%Y-%m-%d %H:%M:%S')
+    payload = json.dumps([sort, direction, value, row['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor, sort):
+    """Return (direction, sort value, id) of a cursor made by _encode_cursor; ValueError if invalid"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, direction, value, student_id = json.loads(payload)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid student list cursor: {cursor}") from None
+    if cursor_sort != sort or direction not in ('next', 'prev'):
+        raise ValueError(f"Invalid student list cursor: {cursor}")
+    return direction, value, student_id
+
+
+def _filter_clause(keyword='', filiere_id=None, type_section='', pavilion='', chambre=''):
+    """Compile the student list filters; empty filters are ignored.
+
+    Returns (search join, WHERE clause, its params, relevance) where the
+    join goes right after `FROM students s` and relevance is (expression,
+    params) for ranking keyword matches, or None without a keyword.
+    `keyword` matches words of nom, prenom, matricule and cin through the
+    search index (see models.search); type_section 'aucun' and chambre
+    'Aucune' select students without one; `pavilion` needs rooms joined as r.
+    """
+    joins = ""
+    relevance = None
+    conditions = []
+    params = []
+    search = search_join(keyword)
+    if search:
+        joins, condition, search_params, score, score_params = search
+        conditions.append(condition)
+        params.extend(search_params)
+        relevance = (score, score_params)
+    elif (keyword or '').strip():
+        # Only punctuation: nothing can match
+        conditions.append("1 = 0")
+    if filiere_id:
+        conditions.append("s.filiere_id = %s")
+        params.append(filiere_id)
+    if type_section == 'aucun':
+        conditions.append("(s.type_section IS NULL OR s.type_section = '')")
+    elif type_section:
+        conditions.append("s.type_section = %s")
+        params.append(type_section)
+    if pavilion:
+        conditions.append("r.pavilion = %s")
+        params.append(pavilion)
+    if chambre == 'Aucune':
+        conditions.append("(s.num_chambre IS NULL OR s.num_chambre = '')")
+    elif chambre:
+        conditions.append("s.num_chambre = %s")
+        params.append(chambre)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return joins, where, tuple(params), relevance
+
+
+class Student(BaseModel):
     def __init__(self):
+        super().__init__()
         self.table_name = 'students'
-        self.conn = get_connection()
-        self.cursor = self.conn.cursor(pymysql.cursors.DictCursor)
 
-    def __del__(self):
-        if hasattr(self, 'cursor') and self.cursor:
-            self.cursor.close()
-        if hasattr(self, 'conn') and self.conn:
-            self.conn.close()
+    def _fetch(self, projection, query, params=None, tables=()):
+        """Run a student list query in a projection resolved by _projection(); `query` has a {columns} placeholder"""
+        columns, record = projection
+        query = query.format(columns=columns)
+        if record is not None:
+            return self.fetch_records(query, record, params, tables=tables)
+        if tables:
+            return self.cached_fetch(query, params, tables=tables)
+        self.cursor.execute(query, params)
+        return self.cursor.fetchall()
 
-    def get_all_students(self):
+    def get_all_students(self, projection='full'):
+        projection = _projection(projection)
         try:
-            self.cursor.execute("""
-                SELECT s.*, f.name as filiere_name, r.pavilion
+            return self._fetch(projection, """
+                SELECT {columns}
                 FROM students s
-                LEFT JOIN filieres f ON s.filiere_id = f.id
-                LEFT JOIN rooms r ON s.num_chambre = r.room_number
+                LEFT JOIN filieres f ON f.id = s.filiere_id
+                LEFT JOIN rooms r ON r.id = s.room_id
                 ORDER BY s.created_at DESC
-            """)
-            return self.cursor.fetchall()
+            """, tables=('students', 'filieres', 'rooms'))
         except Exception as e:
             print(f"[ERROR] get_all_students: {e}")
             return []
 
+    def iter_students(self, batch_size=None, projection='full', **filters):
+        """Stream the students matching `filters` (see _filter_clause) without buffering the table.
+
+        One joined query filtered in SQL, streamed on the session's connection
+        (consume the rows before issuing other queries); rows come newest
+        first, or best keyword match first.
+        """
+        from database.db import stream_query
+        columns, record = _projection(projection)
+        joins, where, params, relevance = _filter_clause(**filters)
+        ordering = "s.created_at DESC, s.id DESC"
+        if relevance:
+            ordering = f"{relevance[0]} DESC, {ordering}"
+            params += tuple(relevance[1])
+        rows = stream_query(f"""
+            SELECT {columns}
+            FROM students s
+            {joins}
+            LEFT JOIN filieres f ON f.id = s.filiere_id
+            LEFT JOIN rooms r ON r.id = s.room_id
+            {where}
+            ORDER BY {ordering}
+        """, params or None, batch_size=batch_size, dict_rows=record is None, conn=self.session.conn)
+        return rows if record is None else map(record._make, rows)
+
+    def get_students_page(self, limit, offset=0, projection='list', sort=None, **filters):
+        """One page of the filtered student list and the number of matching students.
+
+        `filters` are the keyword arguments of _filter_clause(). Filtering,
+        counting and slicing all happen in SQL. Pages follow the SORTS order
+        `sort`; without one, keyword matches come best first and other lists
+        newest first.
+        """
+        column, order = _sort(sort or 'recent')
+        projection = _projection(projection)
+        if not (filters.get('keyword') or '').strip() and column == 'created_at':
+            # Facet filters only: the columnar index finds the page, which is then read by id
+            indexed = student_index.page(self, limit, offset, filiere_id=filters.get('filiere_id'),
+                                         type_section=filters.get('type_section'), pavilion=filters.get('pavilion'),
+                                         num_chambre=filters.get('chambre'))
+            if indexed is not None:
+                ids, total = indexed
+                return self._fetch_by_ids(projection, ids), total
+        joins, where, params, relevance = _filter_clause(**filters)
+        ordering = f"s.{column} {order}, s.id {order}"
+        order_params = ()
+        if relevance and not sort:
+            ordering = f"{relevance[0]} DESC, {ordering}"
+            order_params = tuple(relevance[1])
+        try:
+            rooms_join = "LEFT JOIN rooms r ON r.id = s.room_id" if filters.get('pavilion') else ""
+            total = self.cached_fetch(f"SELECT COUNT(*) AS total FROM students s {joins} {rooms_join} {where}", params,
+                                      tables=('students', 'student_search', 'rooms'), one=True)['total']
+            if not total or offset >= total:
+                return [], total
+            students = self._fetch(projection, f"""
+                SELECT {{columns}}
+                FROM students s
+                {joins}
+                LEFT JOIN filieres f ON f.id = s.filiere_id
+                LEFT JOIN rooms r ON r.id = s.room_id
+                {where}
+                ORDER BY {ordering}
+                LIMIT %s OFFSET %s
+            """, params + order_params + (limit, offset), tables=('students', 'student_search', 'filieres', 'rooms'))
+            return students, total
+        except Exception as e:
+            print(f"[ERROR] get_students_page: {e}")
+            return [], 0
+
+    def _fetch_by_ids(self, projection, ids):
+        """Students with these ids in the projection resolved by _projection(), in the order of `ids`"""
+        if not ids:
+            return []
+        try:
+            rows = self._fetch(projection, f"""
+                SELECT {{columns}}
+                FROM students s
+                LEFT JOIN filieres f ON f.id = s.filiere_id
+                LEFT JOIN rooms r ON r.id = s.room_id
+                WHERE s.id IN ({', '.join(['%s'] * len(ids))})
+            """, tuple(ids), tables=('students', 'filieres', 'rooms'))
+        except Exception as e:
+            print(f"[ERROR] _fetch_by_ids: {e}")
+            return []
+        by_id = {row['id']: row for row in rows}
+        return [by_id[student_id] for student_id in ids if student_id in by_id]
+
+    def get_students_keyset(self, limit, page_cursor=None, projection='list', sort='recent', **filters):
+        """The page of the filtered student list that follows (or precedes) `page_cursor`.
+
+        Returns (students, next_cursor, prev_cursor), a cursor being None at
+        either end of the list. Pages seek past the (sort column, id) of the
+        cursor row instead of skipping rows with OFFSET, so any page is one
+        index range read and rows inserted meanwhile do not shift the pages.
+        Raises ValueError for an unknown sort or an invalid cursor.
+        """
+        column, order = _sort(sort)
+        projection = _projection(projection)
+        record = projection[1]
+        if record is not None and not {column, 'id'} <= set(record._fields):
+            raise ValueError(f"Projection without {column} and id cannot be paged by {sort}")
+        direction, value, student_id = _decode_cursor(page_cursor, sort) if page_cursor else ('next', None, None)
+        backwards = direction == 'prev'
+        # Scan towards the requested side of the cursor, then put a backwards page back in order
+        descending = (order == 'DESC') != backwards
+        scan = 'DESC' if descending else 'ASC'
+        joins, where, params, _ = _filter_clause(**filters)
+        if page_cursor:
+            op = '<' if descending else '>'
+            seek = f"(s.{column} {op} %s OR (s.{column} = %s AND s.id {op} %s))"
+            where = f"{where} AND {seek}" if where else f"WHERE {seek}"
+            params += (value, value, student_id)
+        try:
+            students = self._fetch(projection, f"""
+                SELECT {{columns}}
+                FROM students s
+                {joins}
+                LEFT JOIN filieres f ON f.id = s.filiere_id
+                LEFT JOIN rooms r ON r.id = s.room_id
+                {where}
+                ORDER BY s.{column} {scan}, s.id {scan}
+                LIMIT %s
+            """, params + (limit + 1,))
+        except Exception as e:
+            print(f"[ERROR] get_students_keyset: {e}")
+            return [], None, None
+        # The extra row only tells whether the list goes on past this page
+        more = len(students) > limit
+        students = list(students[:limit])
+        if not students:
+            return [], None, None
+        if backwards:
+            students.reverse()
+        has_next = True if backwards else more
+        has_prev = more if backwards else page_cursor is not None
+        next_cursor = _encode_cursor(sort, 'next', students[-1]) if has_next else None
+        prev_cursor = _encode_cursor(sort, 'prev', students[0]) if has_prev else None
+        return students, next_cursor, prev_cursor
+
+    def search_students(self, keyword=None, chambre=None, projection='full'):
+        """Every student matching `keyword` through the search index, best match first, optionally in one room"""
+        projection = _projection(projection)
+        joins, where, params, relevance = _filter_clause(keyword=keyword, chambre=chambre)
+        ordering = "s.created_at DESC, s.id DESC"
+        if relevance:
+            ordering = f"{relevance[0]} DESC, {ordering}"
+            params += tuple(relevance[1])
+        try:
+            return self._fetch(projection, f"""
+                SELECT {{columns}}
+                FROM students s
+                {joins}
+                LEFT JOIN filieres f ON f.id = s.filiere_id
+                LEFT JOIN rooms r ON r.id = s.room_id
+                {where}
+                ORDER BY {ordering}
+            """, params, tables=('students', 'student_search', 'filieres', 'rooms'))
+        except Exception as e:
+            print(f"[ERROR] search_students: {e}")
+            return []
+
     def get_student_by_id(self, student_id):
+        """One student with every column, including the student_details fields (once per request)"""
+        return self.identity_fetch(self.table_name, 'id', student_id, lambda: self._load_student(student_id),
+                                   keys=('id', 'matricule'), depends=('student_details', 'filieres', 'rooms'))
+
+    def _load_student(self, student_id):
         try:
             self.cursor.execute("""
-                SELECT s.*, f.name as filiere_name, r.room_number, r.pavilion, r.room_type, r.capacity
+                SELECT s.*, d.dossier_medicale, d.observation,
+                       f.name as filiere_name, r.room_number, r.pavilion, r.room_type, r.capacity
                 FROM students s
-                LEFT JOIN filieres f ON s.filiere_id = f.id
-                LEFT JOIN rooms r ON s.num_chambre = r.room_number
+                LEFT JOIN student_details d ON d.student_id = s.id
+                LEFT JOIN filieres f ON f.id = s.filiere_id
+                LEFT JOIN rooms r ON r.id = s.room_id
                 WHERE s.id = %s
             """, (student_id,))
             return self.cursor.fetchone()
@@ -49,7 +339,45 @@ class Student:
     def get_student(self, student_id):
         return self.get_student_by_id(student_id)
 
-    def create_student(self, student_data):
+    INSERT_FIELDS = [
+        'nom', 'prenom', 'matricule', 'cin', 'date_naissance', 'nationalite', 'sexe',
+        'telephone', 'email', 'annee_universitaire', 'filiere_id', 'laureat', 'num_chambre',
+        'room_id', 'mobilite', 'vie_associative', 'bourse', 'photo', 'type_section']
+    # Large TEXT fields kept in the 1:1 student_details table
+    DETAIL_FIELDS = ['dossier_medicale', 'observation']
+
+    def _save_details(self, students, batch_size=None):
+        """Insert or replace the student_details rows of (student_id, data) pairs"""
+        from database.db import bulk_insert
+        rows = [(student_id,) + tuple(data.get(k) for k in self.DETAIL_FIELDS) for student_id, data in students]
+        if not rows:
+            return
+        results = bulk_insert('student_details', ['student_id'] + self.DETAIL_FIELDS, rows,
+                              batch_size=batch_size, on_duplicate_update=self.DETAIL_FIELDS, conn=self.conn)
+        failed = [result['error'] for result in results if not result['success']]
+        if failed:
+            raise Exception(f"student_details: {len(failed)} row(s) not saved: {failed[0]}")
+        self.session.mark_dirty('student_details')
+
+    def _save_search(self, students, batch_size=None):
+        """Insert or replace the student_search rows of (student_id, data) pairs"""
+        from database.db import bulk_insert
+        rows = [(student_id, search_terms(data)) for student_id, data in students]
+        if not rows:
+            return
+        results = bulk_insert('student_search', ['student_id', 'terms'], rows,
+                              batch_size=batch_size, on_duplicate_update=['terms'], conn=self.conn)
+        failed = [result['error'] for result in results if not result['success']]
+        if failed:
+            raise Exception(f"student_search: {len(failed)} row(s) not saved: {failed[0]}")
+        self.session.mark_dirty('student_search')
+
+    def _touch_index(self, student_ids):
+        """Have the columnar student index re-read these students after the commit"""
+        student_index.touch(self.session, student_ids)
+
+    def _prepare_student_data(self, student_data):
+        """Validate required fields and fill defaults before an insert"""
         required = ['nom', 'matricule', 'sexe']
         for field in required:
             if not student_data.get(field):
@@ -80,54 +408,148 @@ class Student:
             elif isinstance(v, str) and v.strip().lower() == 'nan':
                 student_data[k] = None
 
-        # Ensure filiere_id is None if missing or empty
-        if not student_data.get('filiere_id') or str(student_data.get('filiere_id')).strip() in ('', 'None', 'none', 'null'):
+        # filiere_id is an integer reference; anything else means no filiere
+        try:
+            student_data['filiere_id'] = int(float(student_data['filiere_id'])) if student_data.get('filiere_id') is not None else None
+        except (ValueError, TypeError):
             student_data['filiere_id'] = None
+        if student_data.get('num_chambre') in ('', 'no room'):
+            student_data['num_chambre'] = None
+        return student_data
 
-        query = """
-        INSERT INTO students (
-            nom, prenom, matricule, cin, date_naissance, nationalite,
-            sexe, telephone, email, annee_universitaire, filiere_id,
-            dossier_medicale, observation, laureat, num_chambre,
-            mobilite, vie_associative, bourse, photo, type_section
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
+    def _resolve_room_ids(self, rows):
+        """Fill room_id from num_chambre for prepared rows, with one lookup for all of them"""
+        from models.room import Room
+        room_ids = Room(self.session).get_room_ids(row.get('num_chambre') for row in rows)
+        for row in rows:
+            row['room_id'] = room_ids.get(row.get('num_chambre'))
+
+    def create_student(self, student_data):
+        student_data = self._prepare_student_data(student_data)
 
-        params = tuple(student_data[k] for k in [
-            'nom', 'prenom', 'matricule', 'cin', 'date_naissance', 'nationalite', 'sexe',
-            'telephone', 'email', 'annee_universitaire', 'filiere_id', 'dossier_medicale',
-            'observation', 'laureat', 'num_chambre', 'mobilite', 'vie_associative', 'bourse',
-            'photo', 'type_section'])
+        query = f"""
+        INSERT INTO students ({', '.join(self.INSERT_FIELDS)})
+        VALUES ({', '.join(['%s'] * len(self.INSERT_FIELDS))})
+        """
 
         try:
+            self._resolve_room_ids([student_data])
+            params = tuple(student_data[k] for k in self.INSERT_FIELDS)
             self.cursor.execute(query, params)
-            self.conn.commit()
             student_id = self.cursor.lastrowid
-            
-            # Update room status if a room is assigned
-            if student_data.get('num_chambre'):
-                from models.room import Room
-                Room().set_room_used_status(student_data['num_chambre'])
-                
+            self._save_details([(student_id, student_data)])
+            self._save_search([(student_id, student_data)])
+            self._touch_index([student_id])
+
+            # Count the student in its room and log the assignment within the same transaction
+            from models.room import Room
+            from models.room_history import RoomHistory
+            Room(self.session).adjust_occupancy(student_data.get('room_id'), 1)
+            RoomHistory(self.session).record_transition(
+                student_id, (None, None), (student_data.get('num_chambre'), student_data['annee_universitaire']))
+
+            self.session.mark_dirty(self.table_name)
+            self.session.commit()
             return student_id
         except Exception as e:
             print(f"[ERROR] create_student: {e}")
-            self.conn.rollback()
+            self.session.rollback()
             return None
 
+    def create_students(self, students, batch_size=None):
+        """Insert many students with batched multi-row INSERTs.
+
+        Returns one outcome per input row: {'index', 'success', 'error'}.
+        Occupancy of the touched rooms is recomputed with one statement, in the import transaction.
+        """
+        from database.db import bulk_insert
+        outcomes = [None] * len(students)
+        prepared = []
+        positions = []
+        for i, student_data in enumerate(students):
+            try:
+                prepared.append(self._prepare_student_data(dict(student_data)))
+                positions.append(i)
+            except Exception as e:
+                outcomes[i] = {'index': i, 'success': False, 'error': str(e)}
+
+        try:
+            self._resolve_room_ids(prepared)
+            results = bulk_insert(self.table_name, self.INSERT_FIELDS, prepared,
+                                  batch_size=batch_size, conn=self.conn)
+            inserted = [student_data for student_data, result in zip(prepared, results) if result['success']]
+            # One set-based recount for every room the import touched
+            from models.room import Room
+            Room(self.session).reconcile_occupancy({student_data.get('num_chambre') for student_data in inserted})
+            ids = self._ids_by_matricule(inserted, batch_size)
+            saved = [(ids[row['matricule']], row) for row in inserted if row['matricule'] in ids]
+            self._save_details(saved, batch_size)
+            self._save_search(saved, batch_size)
+            self._touch_index([student_id for student_id, _ in saved])
+            self._record_assignments(inserted, ids, batch_size)
+            self.session.mark_dirty(self.table_name)
+            self.session.commit()
+        except Exception as e:
+            print(f"[ERROR] create_students: {e}")
+            self.session.rollback()
+            results = [{'success': False, 'error': str(e)} for _ in prepared]
+
+        for position, result in zip(positions, results):
+            outcomes[position] = {'index': position, 'success': result['success'], 'error': result['error']}
+        return outcomes
+
+    def _ids_by_matricule(self, rows, batch_size=None):
+        """Map the matricule of freshly inserted rows to their student id, one query per batch"""
+        from database.db import DB_BULK_BATCH_SIZE
+        matricules = sorted({row['matricule'] for row in rows})
+        batch_size = batch_size or DB_BULK_BATCH_SIZE
+        ids = {}
+        for start in range(0, len(matricules), batch_size):
+            chunk = matricules[start:start + batch_size]
+            self.cursor.execute(f"""
+                SELECT id, matricule FROM students
+                WHERE matricule IN ({', '.join(['%s'] * len(chunk))})
+            """, tuple(chunk))
+            ids.update((row['matricule'], row['id']) for row in self.cursor.fetchall())
+        return ids
+
+    def _record_assignments(self, rows, ids, batch_size=None):
+        """Log the room assignment of freshly inserted rows, given their ids by matricule"""
+        from models.room_history import ASSIGN, RoomHistory, academic_year
+        RoomHistory(self.session).record([
+            (ids[row['matricule']], row['num_chambre'], academic_year(row['annee_universitaire']), ASSIGN)
+            for row in rows if row.get('num_chambre') and row['matricule'] in ids
+        ], batch_size=batch_size)
+
     def add_student(self, student_data):
         return self.create_student(student_data)
 
-    def update_student(self, student_id, student_data):
-        allowed_fields = [
-            'nom', 'prenom', 'matricule', 'cin', 'date_naissance', 'nationalite', 'sexe',
-            'telephone', 'email', 'annee_universitaire', 'filiere_id', 'dossier_medicale',
-            'observation', 'laureat', 'num_chambre', 'mobilite', 'vie_associative',
-            'bourse', 'photo', 'type_section'
-        ]
-        
+    UPDATE_FIELDS = [
+        'nom', 'prenom', 'matricule', 'cin', 'date_naissance', 'nationalite', 'sexe',
+        'telephone', 'email', 'annee_universitaire', 'filiere_id', 'dossier_medicale',
+        'observation', 'laureat', 'num_chambre', 'mobilite', 'vie_associative',
+        'bourse', 'photo', 'type_section'
+    ]
+
+    @staticmethod
+    def _same_value(stored, new):
+        # Form values are strings while the row holds ints and dates
+        if stored is None or new is None:
+            return stored is new
+        return stored == new or str(stored) == str(new)
+
+    def update_student(self, student_id, student_data, existing=None):
+        """Write the fields of student_data that differ from the stored student.
+
+        `existing` is the student as returned by get_student_by_id, when the
+        caller has already loaded it. Only changed columns are updated, and
+        nothing is written when nothing changed; room occupancy and history
+        are only touched when the room or the academic year changes.
+        """
+        allowed_fields = self.UPDATE_FIELDS
+
         # Get existing student data
-        existing_student = self.get_student_by_id(student_id)
+        existing_student = existing or self.get_student_by_id(student_id)
         if not existing_student:
             return False
             
@@ -137,7 +559,7 @@ class Student:
                 student_data[field] = existing_student.get(field)
 
         # Handle empty room number - explicitly set to None if empty string or other empty values
-        if 'num_chambre' in student_data and student_data['num_chambre'] in ['', 'None', 'none', 'null', None]:
+        if 'num_chambre' in student_data and student_data['num_chambre'] in ['', 'None', 'none', 'null', 'no room', None]:
             student_data['num_chambre'] = None
 
         # Handle filiere_id
@@ -153,92 +575,123 @@ class Student:
         if 'annee_universitaire' not in student_data or not student_data['annee_universitaire']:
             student_data['annee_universitaire'] = existing_student.get('annee_universitaire')
 
+        changes = {field: student_data[field] for field in allowed_fields
+                   if not self._same_value(existing_student.get(field), student_data[field])}
+        if not changes:
+            return True
+
         try:
-            # Get previous room before update
-            self.cursor.execute("SELECT num_chambre FROM students WHERE id = %s", (student_id,))
-            prev_room = self.cursor.fetchone()
-            prev_room_number = prev_room['num_chambre'] if prev_room and isinstance(prev_room, dict) else None
-
-            query = """
-            UPDATE students SET
-                nom = %s, prenom = %s, matricule = %s, cin = %s,
-                date_naissance = %s, nationalite = %s, sexe = %s,
-                telephone = %s, email = %s, annee_universitaire = %s,
-                filiere_id = %s, dossier_medicale = %s, observation = %s,
-                laureat = %s, num_chambre = %s, mobilite = %s,
-                vie_associative = %s, bourse = %s, photo = %s,
-                type_section = %s WHERE id = %s
-            """
-
-            params = tuple(student_data[k] for k in allowed_fields) + (student_id,)
-            self.cursor.execute(query, params)
-            self.conn.commit()
+            column_changes = {field: value for field, value in changes.items() if field not in self.DETAIL_FIELDS}
+            if 'num_chambre' in changes:
+                self._resolve_room_ids([student_data])
+                column_changes['room_id'] = student_data['room_id']
+            if column_changes:
+                assignments = ', '.join(f"{field} = %s" for field in column_changes)
+                self.cursor.execute(f"UPDATE students SET {assignments} WHERE id = %s",
+                                    tuple(column_changes.values()) + (student_id,))
+                self.session.mark_dirty(self.table_name)
+                self._touch_index([student_id])
+            if any(field in changes for field in self.DETAIL_FIELDS):
+                self._save_details([(student_id, student_data)])
+            if any(field in changes for field in SEARCH_COLUMNS):
+                self._save_search([(student_id, student_data)])
 
-            # After update, recalculate room usage for both previous and new room
-            from models.room import Room
-            room_model = Room()
-            
-            # Update previous room status if it exists and is different from new room
-            if prev_room_number and prev_room_number != student_data.get('num_chambre'):
-                room_model.set_room_used_status(prev_room_number)
-            
-            # Update new room status if it exists
-            if student_data.get('num_chambre'):
-                room_model.set_room_used_status(student_data['num_chambre'])
-            
+            prev_room_number = existing_student.get('num_chambre')
+            new_room_number = student_data.get('num_chambre')
+            if 'num_chambre' in changes:
+                # Move the student between room counters in the same transaction
+                from models.room import Room
+                room_model = Room(self.session)
+                room_model.adjust_occupancy(existing_student.get('room_id'), -1)
+                room_model.adjust_occupancy(student_data.get('room_id'), 1)
+            if 'num_chambre' in changes or 'annee_universitaire' in changes:
+                from models.room_history import RoomHistory
+                RoomHistory(self.session).record_transition(
+                    student_id, (prev_room_number, existing_student.get('annee_universitaire')),
+                    (new_room_number, student_data['annee_universitaire']))
+
+            self.session.commit()
             return True
         except Exception as e:
             print(f"[ERROR] update_student: {repr(e)} (type: {type(e)})")
-            self.conn.rollback()
+            self.session.rollback()
             return {'error': f'{repr(e)} (type: {type(e)})'}
 
+    def update_student_image(self, student_id, filename):
+        """Store the uploaded photo filename of a student"""
+        result = self.update_student(student_id, {'photo': filename})
+        if result is True:
+            return {'status': 'success'}
+        if result is False:
+            return {'error': 'Étudiant non trouvé'}
+        return result
+
+    def set_academic_year(self, annee_universitaire):
+        """Move every student to a new academic year, logging housed students in their room for it"""
+        from models.room_history import RoomHistory
+        try:
+            RoomHistory(self.session).record_year_start(annee_universitaire)
+            self.cursor.execute("UPDATE students SET annee_universitaire = %s", (annee_universitaire,))
+            updated = self.cursor.rowcount
+            self.session.mark_dirty(self.table_name)
+            self.session.commit()
+            return updated
+        except Exception as e:
+            print(f"[ERROR] set_academic_year: {e}")
+            self.session.rollback()
+            raise
+
     def delete_student(self, student_id):
         try:
             # Get student's room before deletion
-            self.cursor.execute("SELECT num_chambre FROM students WHERE id = %s", (student_id,))
+            self.cursor.execute("SELECT id, num_chambre, room_id, annee_universitaire FROM students WHERE id = %s",
+                                (student_id,))
             student = self.cursor.fetchone()
-            room_number = student['num_chambre'] if student and isinstance(student, dict) else None
+            room_id = student['room_id'] if student and isinstance(student, dict) else None
 
-            # Delete the student
+            # Delete the student, release its place and log it in the same transaction
             self.cursor.execute("DELETE FROM students WHERE id = %s", (student_id,))
-            self.conn.commit()
-
-            # Update room status if student had a room
-            if room_number:
+            if self.cursor.rowcount:
                 from models.room import Room
-                Room().set_room_used_status(room_number)
-
+                from models.room_history import RoomHistory
+                Room(self.session).adjust_occupancy(room_id, -1)
+                RoomHistory(self.session).record_releases([student])
+                self._touch_index([student_id])
+            self.session.mark_dirty(self.table_name)
+            self.session.commit()
             return True
         except Exception as e:
             error_msg = f"[ERROR] delete_student: {repr(e)} (type: {type(e)})"
             print(error_msg)
-            self.conn.rollback()
+            self.session.rollback()
             return {'error': error_msg}
 
-    def get_students_by_filiere(self, filiere_id):
+    def get_students_by_filiere(self, filiere_id, projection='full'):
+        projection = _projection(projection)
         try:
-            self.cursor.execute("""
-                SELECT s.*, f.name as filiere_name
+            return self._fetch(projection, """
+                SELECT {columns}
                 FROM students s
-                LEFT JOIN filieres f ON s.filiere_id = f.id
+                LEFT JOIN filieres f ON f.id = s.filiere_id
+                LEFT JOIN rooms r ON r.id = s.room_id
                 WHERE s.filiere_id = %s
                 ORDER BY s.created_at DESC
             """, (filiere_id,))
-            return self.cursor.fetchall()
         except Exception as e:
             print(f"[ERROR] get_students_by_filiere: {e}")
             return []
 
-    def get_students_by_room(self, room_number):
+    def get_students_by_room(self, room_number, projection='full'):
+        projection = _projection(projection)
         try:
-            self.cursor.execute("""
-                SELECT s.*, f.name as filiere_name
-                FROM students s
-                LEFT JOIN filieres f ON s.filiere_id = f.id
-                WHERE s.num_chambre = %s
+            return self._fetch(projection, """
+                SELECT {columns}
+                FROM rooms r
+                JOIN students s ON s.room_id = r.id
+                LEFT JOIN filieres f ON f.id = s.filiere_id
+                WHERE r.room_number = %s
                 ORDER BY s.created_at DESC
             """, (room_number,))
-            return self.cursor.fetchall()
         except Exception as e:
             print(f"[ERROR] get_students_by_room: {e}")
             return []
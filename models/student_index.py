@@ -0,0 +1,311 @@
+# models/student_index.py
+"""Optional in-process columnar index of the student list facets.
+
+The index holds one NumPy array per facet (filiere, type_section, pavilion,
+chambre, sexe) of small integer codes, plus the ids and creation times, all
+read with one streaming query. Combined filters become boolean masks, so a
+filtered page of the student list costs no scan of the students table; the
+page's rows are then read by primary key.
+
+Filters mean what they mean in SQL (models.student._filter_clause):
+values are converted to the column's type, type_section 'aucun' and chambre
+'Aucune' select students without one. A filter the index cannot match
+exactly, such as a value MySQL's collation could equate with another one,
+makes it answer None so the caller falls back to SQL.
+
+Requests never query the database for the index. A background worker, on a
+pooled connection of its own, re-reads the students a committed write
+touched (Student._touch_index) and rebuilds the arrays after changes that can
+move many students at once (rooms renamed or deleted, filieres deleted) or
+once DB_STUDENT_INDEX_TTL expires, which also picks up writes made by other
+worker processes. Until the worker is done, requests read SQL, except after
+a mere TTL expiry where the old arrays keep answering.
+
+Without numpy, or with DB_STUDENT_INDEX_ENABLED off (the default), every
+method returns None and callers answer with SQL.
+"""
+import threading
+import time
+from datetime import datetime
+
+from database.cache import query_cache
+from database.db import DB_STUDENT_INDEX_ENABLED, DB_STUDENT_INDEX_TTL, is_sqlite
+from models.search import fold
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FACETS = ('filiere_id', 'type_section', 'pavilion', 'num_chambre', 'sexe')
+# Filter values meaning "no value", as in _filter_clause
+NONE_VALUES = {'type_section': 'aucun', 'num_chambre': 'Aucune'}
+# Writes to these tables can change the facets of many students: rebuild
+REBUILD_TABLES = ('room_metadata', 'filieres')
+# Beyond this many changed students a rebuild is cheaper than re-reading them by id
+MAX_REFRESH = 1000
+
+SOURCE_QUERY = """
+    SELECT s.id, s.created_at, s.filiere_id, s.type_section, r.pavilion, s.num_chambre, s.sexe
+    FROM students s
+    LEFT JOIN rooms r ON r.id = s.room_id
+"""
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _timestamp(value):
+    return int((value - _EPOCH).total_seconds()) if isinstance(value, datetime) else 0
+
+
+class _Unmatchable(Exception):
+    """A filter value the index cannot compare exactly like SQL would"""
+
+
+class _Columns:
+    """Facet codes of every student in parallel arrays, one slot per student.
+
+    Code 0 of every facet stands for no value (NULL or ''). Deleted students
+    keep their slot, marked dead, until the next rebuild.
+    """
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.slots = {}
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.created = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.codes = {facet: np.zeros(capacity, dtype=np.int32) for facet in FACETS}
+        self.vocab = {facet: {None: 0} for facet in FACETS}
+        self.values = {facet: [None] for facet in FACETS}
+        # Folded spelling -> number of values, to spot values a collation may equate
+        self.spellings = {facet: {} for facet in FACETS}
+
+    def _grow(self, needed):
+        capacity = len(self.ids)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        self.ids = np.resize(self.ids, capacity)
+        self.created = np.resize(self.created, capacity)
+        self.alive = np.resize(self.alive, capacity)
+        self.alive[self.size:] = False
+        for facet in FACETS:
+            self.codes[facet] = np.resize(self.codes[facet], capacity)
+
+    def _code(self, facet, value):
+        if value == '':
+            value = None
+        vocab = self.vocab[facet]
+        code = vocab.get(value)
+        if code is None:
+            code = vocab[value] = len(self.values[facet])
+            self.values[facet].append(value)
+            if isinstance(value, str):
+                spelling = ' '.join(fold(value))
+                self.spellings[facet][spelling] = self.spellings[facet].get(spelling, 0) + 1
+        return code
+
+    def store(self, rows):
+        """Write (id, created_at, *facets) rows into their slots, appending new students"""
+        rows = list(rows)
+        self._grow(self.size + len(rows))
+        for row in rows:
+            student_id = row[0]
+            slot = self.slots.get(student_id)
+            if slot is None:
+                slot = self.slots[student_id] = self.size
+                self.size += 1
+            self.ids[slot] = student_id
+            self.created[slot] = _timestamp(row[1])
+            self.alive[slot] = True
+            for facet, value in zip(FACETS, row[2:]):
+                self.codes[facet][slot] = self._code(facet, value)
+
+    def kill(self, student_ids):
+        for student_id in student_ids:
+            slot = self.slots.get(student_id)
+            if slot is not None:
+                self.alive[slot] = False
+
+    def match(self, facet, value):
+        """Code of the students a facet=value filter selects, None if none can match.
+
+        Raises _Unmatchable when only SQL can tell.
+        """
+        if value == NONE_VALUES.get(facet):
+            return 0
+        if facet == 'filiere_id':
+            try:
+                value = int(str(value).strip())
+            except ValueError:
+                raise _Unmatchable(f"filiere_id={value!r}")
+            return self.vocab[facet].get(value)
+        value = str(value)
+        code = self.vocab[facet].get(value)
+        if not is_sqlite():
+            # MySQL compares strings with a case- and accent-insensitive, space-padded
+            # collation: only trust an exact match that no other stored value may equal
+            spelling = ' '.join(fold(value))
+            if code is None or self.spellings[facet].get(spelling, 0) != 1:
+                raise _Unmatchable(f"{facet}={value!r}")
+        return code
+
+    def mask(self, filters):
+        """Boolean mask of the live students matching facet=value filters (empty values ignored)"""
+        mask = self.alive[:self.size].copy()
+        for facet, value in filters.items():
+            if not value:
+                continue
+            code = self.match(facet, value)
+            if code is None:
+                return np.zeros(self.size, dtype=bool)
+            mask &= self.codes[facet][:self.size] == code
+        return mask
+
+
+class StudentIndex:
+    def __init__(self):
+        # Guards _columns: held while reading or patching them, never while querying
+        self._lock = threading.Lock()
+        # Guards the worker's queue: pending ids, the rebuild request and the running flags
+        self._pending_lock = threading.Lock()
+        self._pending = set()
+        self._patching = False
+        self._rebuild_requested = False
+        self._working = False
+        self._columns = None
+        self._stale = False
+        self._generation = 0
+        self._expires_at = 0
+
+    @property
+    def available(self):
+        return np is not None and DB_STUDENT_INDEX_ENABLED
+
+    def touch(self, session, student_ids):
+        """Re-read these students once the session's transaction commits"""
+        if not self.available:
+            return
+        student_ids = [student_id for student_id in student_ids if student_id is not None]
+        if student_ids:
+            session.after_commit(lambda: self._queue(student_ids))
+
+    def _queue(self, student_ids=(), rebuild=False):
+        """Hand changed ids or a rebuild to the background worker, starting it if idle"""
+        with self._pending_lock:
+            self._pending.update(student_ids)
+            self._rebuild_requested = self._rebuild_requested or rebuild
+            if self._working:
+                return
+            self._working = True
+        threading.Thread(target=self._work, name='student-index-worker', daemon=True).start()
+
+    def _work(self):
+        """Run queued rebuilds and re-reads one at a time until the queue is empty"""
+        while True:
+            with self._pending_lock:
+                rebuild = self._rebuild_requested or len(self._pending) > MAX_REFRESH
+                student_ids = set()
+                if rebuild:
+                    # Ids still pending are re-read after the rebuild: they may postdate its snapshot
+                    self._rebuild_requested = False
+                elif self._pending:
+                    student_ids, self._pending = self._pending, set()
+                    self._patching = True
+                else:
+                    self._working = False
+                    return
+            try:
+                if rebuild:
+                    self._rebuild()
+                else:
+                    self._refresh(student_ids)
+            except Exception as e:
+                # The arrays miss these changes: SQL answers until the next read requests a rebuild
+                print(f"[ERROR] StudentIndex worker: {e}")
+                with self._lock:
+                    self._stale = True
+                with self._pending_lock:
+                    self._patching = False
+                    self._working = False
+                return
+            with self._pending_lock:
+                self._patching = False
+
+    def _rebuild(self):
+        from database.db import stream_query_batches
+        generation = query_cache.generation
+        columns = _Columns()
+        # A pooled connection of its own: a fresh snapshot, outside any request transaction
+        for rows in stream_query_batches(SOURCE_QUERY, dict_rows=False):
+            columns.store(rows)
+        with self._lock:
+            self._columns = columns
+            self._generation = generation
+            self._expires_at = time.monotonic() + DB_STUDENT_INDEX_TTL
+            self._stale = False
+
+    def _refresh(self, student_ids):
+        """Re-read these students on a connection of the worker, then patch them into the arrays"""
+        from database.db import InstrumentedCursor, get_connection
+        student_ids = sorted(student_ids)
+        conn = get_connection()
+        cursor = conn.cursor(InstrumentedCursor)
+        try:
+            cursor.execute(f"{SOURCE_QUERY} WHERE s.id IN ({', '.join(['%s'] * len(student_ids))})",
+                           tuple(student_ids))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+        found = {row[0] for row in rows}
+        with self._lock:
+            if self._columns is None:
+                return
+            self._columns.store(rows)
+            self._columns.kill(student_id for student_id in student_ids if student_id not in found)
+
+    def _ready(self, model):
+        """True if the arrays (read under _lock) can answer for `model`; never queries the database"""
+        if not self.available:
+            return False
+        # A transaction with its own uncommitted student writes must read them from the database
+        if model.session.dirty_tables.intersection(('students', 'rooms', 'filieres')):
+            return False
+        if self._columns is None or self._stale or query_cache.changed_since(REBUILD_TABLES, self._generation):
+            # The arrays are missing or wrong: SQL answers until the rebuild is done
+            self._stale = self._columns is not None
+            self._queue(rebuild=True)
+            return False
+        if time.monotonic() >= self._expires_at:
+            # Merely old: keep serving them while fresh ones are read
+            self._queue(rebuild=True)
+        with self._pending_lock:
+            # Committed changes not yet patched in: SQL answers until the worker is done
+            behind = bool(self._pending) or self._patching
+        if behind:
+            self._queue()
+        return not behind
+
+    def page(self, model, limit, offset=0, **filters):
+        """(ids of one page newest first, number of matches) for facet filters, or None"""
+        try:
+            with self._lock:
+                if not self._ready(model):
+                    return None
+                columns = self._columns
+                matched = np.flatnonzero(columns.mask(filters))
+                total = len(matched)
+                if offset >= total:
+                    return [], total
+                # lexsort orders by its last key first: created_at, then id, both ascending
+                order = np.lexsort((columns.ids[matched], columns.created[matched]))[::-1]
+                return columns.ids[matched[order[offset:offset + limit]]].tolist(), total
+        except _Unmatchable:
+            return None
+        except Exception as e:
+            print(f"[ERROR] StudentIndex.page: {e}")
+            return None
+
+
+student_index = StudentIndex()
@@ -1,44 +1,45 @@
-from database.db import get_connection
 from werkzeug.security import check_password_hash, generate_password_hash
+from models.base import BaseModel
 
-class User:
+class User(BaseModel):
     def __init__(self):
-        self.conn = get_connection()
+        super().__init__()
+        self.table_name = 'users'
     
     def create_user(self, username, password, role='user'):
         try:
-            cursor = self.conn.cursor()
+            cursor = self.cursor
             cursor.execute(
                 'INSERT INTO users (username, password, role) VALUES (%s, %s, %s)',
                 (username, generate_password_hash(password), role)
             )
-            self.conn.commit()
+            self.session.mark_dirty(self.table_name)
+            self.session.commit()
             return True, 'Utilisateur créé avec succès'
         except Exception as e:
             print(f"Error creating user: {str(e)}")
             return False, 'Erreur lors de la création de l\'utilisateur'
     
     def get_user_by_username(self, username):
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT * FROM users WHERE username = %s', (username,))
-            return cursor.fetchone()
-        except Exception as e:
-            print(f"Error getting user by username: {str(e)}")
-            return None
-    
+        return self.identity_fetch(self.table_name, 'username', username,
+                                   lambda: self._load_user('username', username), keys=('id', 'username'))
+
     def get_user_by_id(self, user_id):
+        return self.identity_fetch(self.table_name, 'id', user_id,
+                                   lambda: self._load_user('id', user_id), keys=('id', 'username'))
+
+    def _load_user(self, column, value):
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT * FROM users WHERE id = %s', (user_id,))
+            cursor = self.cursor
+            cursor.execute(f'SELECT * FROM users WHERE {column} = %s', (value,))
             return cursor.fetchone()
         except Exception as e:
-            print(f"Error getting user by id: {str(e)}")
+            print(f"Error getting user by {column}: {str(e)}")
             return None
     
     def update_user(self, user_id, data):
         try:
-            cursor = self.conn.cursor()
+            cursor = self.cursor
             allowed_fields = ['username', 'password', 'role']
             updates = []
             values = []
@@ -59,7 +60,8 @@ class User:
             query = f"UPDATE users SET {', '.join(updates)} WHERE id = %s"
             
             cursor.execute(query, values)
-            self.conn.commit()
+            self.session.mark_dirty(self.table_name)
+            self.session.commit()
             return True, 'Utilisateur mis à jour avec succès'
         except Exception as e:
             print(f"Error updating user: {str(e)}")
@@ -68,17 +70,18 @@ class User:
     def delete_user(self, user_id):
         """Delete a user by ID"""
         try:
-            cursor = self.conn.cursor()
+            cursor = self.cursor
             cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
-            self.conn.commit()
+            self.session.mark_dirty(self.table_name)
+            self.session.commit()
             return True, "Utilisateur supprimé avec succès"
         except Exception as e:
-            self.conn.rollback()
+            self.session.rollback()
             return False, f"Erreur lors de la suppression: {str(e)}"
     
     def list_users(self):
         try:
-            cursor = self.conn.cursor()
+            cursor = self.cursor
             cursor.execute('SELECT id, username, role FROM users ORDER BY username')
             return cursor.fetchall()
         except Exception as e:
@@ -94,12 +97,13 @@ class User:
             if not check_password_hash(user['password'], current_password):
                 return False, 'Mot de passe actuel incorrect'
             
-            cursor = self.conn.cursor()
+            cursor = self.cursor
             cursor.execute(
                 'UPDATE users SET password = %s WHERE id = %s',
                 (generate_password_hash(new_password), user_id)
             )
-            self.conn.commit()
+            self.session.mark_dirty(self.table_name)
+            self.session.commit()
             return True, 'Mot de passe modifié avec succès'
         except Exception as e:
             print(f"Error changing password: {str(e)}")
@@ -108,7 +112,7 @@ class User:
     def count_users_by_role(self, role):
         """Count number of users with a specific role"""
         try:
-            cursor = self.conn.cursor()
+            cursor = self.cursor
             cursor.execute("SELECT COUNT(*) as count FROM users WHERE role = %s", (role,))
             result = cursor.fetchone()
             return result['count'] if result else 0
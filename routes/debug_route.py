@@ -1,11 +1,13 @@
 # routes/debug_route.py
-from flask import Blueprint, render_template, redirect, url_for, flash
+from flask import Blueprint, render_template, redirect, url_for, flash, jsonify
 from utils.debug_utils import (
     reset_database_util,
     create_sample_data_util,
     check_db_connection_util,
     cleanup_filieres_util,
-    create_default_admin_user_util
+    create_default_admin_user_util,
+    reconcile_rooms_util,
+    get_db_stats_util
 )
 
 debug_bp = Blueprint('debug', __name__)
@@ -43,6 +45,16 @@ def create_admin():
     flash('Default admin user ensured.', 'success')
     return redirect(url_for('debug.debug_menu'))
 
+@debug_bp.route('/debug/reconcile-rooms', methods=['POST'])
+def reconcile_rooms():
+    fixed = reconcile_rooms_util()
+    flash(f'Room occupancy reconciled ({fixed} room(s) corrected).', 'success')
+    return redirect(url_for('debug.debug_menu'))
+
+@debug_bp.route('/debug/db-stats', methods=['GET'])
+def db_stats():
+    return jsonify(get_db_stats_util())
+
 @debug_bp.route('/debug', methods=['GET'])
 def debug_menu():
     return render_template('debug.html')
@@ -86,7 +86,9 @@ def import_filieres_xlsx():
     imported_count = 0
     imported_filieres = []
     failed_filieres = []
-    existing_filieres = [f['name'] for f in filiere_controller.list_filieres()]
+    existing_filieres = set(f['name'] for f in filiere_controller.list_filieres())
+    pending_filieres = []
+    pending_warnings = []
     for filiere in data:
         # Convert ImmutableMultiDict to dict if needed
         if hasattr(filiere, 'to_dict'):
@@ -102,15 +104,19 @@ def import_filieres_xlsx():
         if filiere.get('name') in existing_filieres:
             failed_filieres.append(f"<b>Filière {filiere.get('name', 'inconnu')}</b> - nom déjà existant.")
             continue
-        try:
-            result = filiere_controller.add_filiere(filiere)
-            if isinstance(result, dict) and result.get('error'):
-                failed_filieres.append(f"<b>Filière {filiere.get('name', 'inconnu')}</b> - erreur: {result['error']}{warning}")
-            else:
-                imported_filieres.append(f"<b>Filière {filiere.get('name', 'inconnu')}</b>{warning}")
-                imported_count += 1
-        except Exception as e:
-            failed_filieres.append(f"<b>Filière {filiere.get('name', 'inconnu')}</b> - erreur technique: {e}{warning}")
+        pending_filieres.append(filiere)
+        pending_warnings.append(warning)
+    # Insert all remaining rows in batches, then report per-row outcomes
+    try:
+        outcomes = filiere_controller.add_filieres(pending_filieres)
+    except Exception as e:
+        outcomes = [{'index': i, 'success': False, 'error': f"erreur technique: {e}"} for i in range(len(pending_filieres))]
+    for filiere, warning, outcome in zip(pending_filieres, pending_warnings, outcomes):
+        if outcome['success']:
+            imported_filieres.append(f"<b>Filière {filiere.get('name', 'inconnu')}</b>{warning}")
+            imported_count += 1
+        else:
+            failed_filieres.append(f"<b>Filière {filiere.get('name', 'inconnu')}</b> - erreur: {outcome['error']}{warning}")
     msg = f"<b>{imported_count} filière(s) importée(s) avec succès !</b>"
     if imported_filieres:
         msg += '<br><u>Filières ajoutées :</u><ul>' + ''.join(f'<li>{s}</li>' for s in imported_filieres) + '</ul>'
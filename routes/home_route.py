@@ -1,7 +1,7 @@
 from flask import Blueprint, render_template, request, flash, redirect, url_for
 from controllers.home_controller import HomeController
 from utils.auth import login_required
-from database.db import get_connection
+from models.student import Student
 from flask import current_app
 
 home_bp = Blueprint('home', __name__)
@@ -21,17 +21,10 @@ def update_annee_universitaire():
     if not new_year:
         flash('Veuillez fournir une nouvelle année universitaire.', 'danger')
         return redirect(url_for('home.home'))
-    conn = get_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute("UPDATE students SET annee_universitaire = %s", (new_year,))
-        conn.commit()
+        Student().set_academic_year(new_year)
         current_app.config['CURRENT_ACADEMIC_YEAR'] = new_year
         flash(f"Année universitaire mise à jour pour tous les étudiants: {new_year}", 'success')
     except Exception as e:
-        conn.rollback()
         flash(f"Erreur lors de la mise à jour: {e}", 'danger')
-    finally:
-        cursor.close()
-        conn.close()
     return redirect(url_for('home.home'))
\ No newline at end of file
@@ -19,7 +19,7 @@ room_controller = RoomController()
 def list_rooms():
     print('room_route.list_rooms called')
     room_model = Room()
-    rooms = room_model.get_all_rooms()
+    rooms = room_model.get_all_rooms('list')
     return render_template('room/list.html', rooms=rooms)
 
 @room_bp.route('/rooms/add', methods=['GET', 'POST'])
@@ -51,7 +51,7 @@ def view_room(room_number):
         return redirect(url_for('room.list_rooms'))
     
     # Get students assigned to this room
-    assigned_students = student_model.get_students_by_room(room_number)
+    assigned_students = student_model.get_students_by_room(room_number, 'list')
     
     return render_template('room/view.html', 
                          room=room_details, 
@@ -72,7 +72,7 @@ def edit_room(room_number):
             'room_type': request.form.get('room_type'),
             'capacity': request.form.get('capacity')
         }
-        if room_model.update_room(room_number, update_data):
+        if room_model.update_room(room_data['id'], update_data):
             flash('Chambre mise à jour avec succès', 'success')
             return redirect(url_for('room.list_rooms'))
         else:
@@ -115,7 +115,9 @@ def import_rooms_xlsx():
     room_controller = RoomController()
     imported_rooms = []
     failed_rooms = []
-    existing_rooms = [r['room_number'] for r in room_controller.list_rooms()]
+    existing_rooms = set(r['room_number'] for r in room_controller.list_rooms())
+    pending_rooms = []
+    pending_warnings = []
     for room in data:
         # Convert ImmutableMultiDict to dict if needed
         if hasattr(room, 'to_dict'):
@@ -132,15 +134,19 @@ def import_rooms_xlsx():
             failed_rooms.append(f"<b>Chambre {room.get('room_number', 'inconnu')}</b> - numéro déjà existant.")
             continue
         room['is_used'] = 0
-        try:
-            result = room_controller.add_room(room)
-            if isinstance(result, dict) and result.get('error'):
-                failed_rooms.append(f"<b>Chambre {room.get('room_number', 'inconnu')}</b> - erreur: {result['error']}{warning}")
-            else:
-                imported_rooms.append(f"<b>Chambre {room.get('room_number', 'inconnu')}</b>{warning}")
-                imported_count += 1
-        except Exception as e:
-            failed_rooms.append(f"<b>Chambre {room.get('room_number', 'inconnu')}</b> - erreur technique: {e}{warning}")
+        pending_rooms.append(room)
+        pending_warnings.append(warning)
+    # Insert all remaining rows in batches, then report per-row outcomes
+    try:
+        outcomes = room_controller.add_rooms(pending_rooms)
+    except Exception as e:
+        outcomes = [{'index': i, 'success': False, 'error': f"erreur technique: {e}"} for i in range(len(pending_rooms))]
+    for room, warning, outcome in zip(pending_rooms, pending_warnings, outcomes):
+        if outcome['success']:
+            imported_rooms.append(f"<b>Chambre {room.get('room_number', 'inconnu')}</b>{warning}")
+            imported_count += 1
+        else:
+            failed_rooms.append(f"<b>Chambre {room.get('room_number', 'inconnu')}</b> - erreur: {outcome['error']}{warning}")
     msg = f"<b>{imported_count} chambre(s) importée(s) avec succès !</b>"
     if imported_rooms:
         msg += '<br><u>Chambres ajoutées :</u><ul>' + ''.join(f'<li>{s}</li>' for s in imported_rooms) + '</ul>'
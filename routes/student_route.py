@@ -11,6 +11,7 @@ from werkzeug.utils import secure_filename
 from utilities.file_utils import handle_file_upload
 from controllers.filiere_controller import FiliereController
 from controllers.room_controller import RoomController
+from models.student import SORTS as STUDENT_SORTS
 from utilities.sample_utils import generate_sample_students_xlsx
 from math import isnan
 
@@ -29,16 +30,39 @@ def list_students():
     internat = request.args.get('type_section', '')
     pavilion = request.args.get('pavilion', '')
     chambre = request.args.get('chambre', '')
-    
+    # Without an explicit sort, keyword matches are ranked and other lists start with the newest
+    sort = request.args.get('sort')
+    if sort not in STUDENT_SORTS:
+        sort = None
+    filters = dict(search=search, filiere_id=filiere_id, internat=internat, pavilion=pavilion, chambre=chambre)
+
+    def page_url(**changes):
+        args = request.args.to_dict()
+        args.update(changes)
+        return url_for('student.list_students', **args)
+
+    # Opt-in keyset pagination: ?cursor= (empty for the first page) pages with opaque cursors
+    if 'cursor' in request.args:
+        try:
+            students, next_cursor, prev_cursor = student_controller.get_students_by_cursor(
+                cursor=request.args.get('cursor') or None, per_page=per_page, sort=sort or 'recent', **filters)
+        except ValueError:
+            flash('Lien de pagination invalide, retour à la première page.', 'warning')
+            students, next_cursor, prev_cursor = student_controller.get_students_by_cursor(
+                per_page=per_page, sort=sort or 'recent', **filters)
+        return render_template('student/list.html',
+                             students=students,
+                             pagination=None,
+                             next_url=page_url(cursor=next_cursor) if next_cursor else None,
+                             prev_url=page_url(cursor=prev_cursor) if prev_cursor else None,
+                             filieres=FiliereController().list_filieres())
+
     # Get paginated students
     students, total = student_controller.get_paginated_students(
         page=page,
         per_page=per_page,
-        search=search,
-        filiere_id=filiere_id,
-        internat=internat,
-        pavilion=pavilion,
-        chambre=chambre
+        sort=sort,
+        **filters
     )
     
     # Create custom pagination object
@@ -79,6 +103,8 @@ def list_students():
     return render_template('student/list.html', 
                          students=students,
                          pagination=pagination,
+                         next_url=page_url(page=pagination.next_num) if pagination.has_next else None,
+                         prev_url=page_url(page=pagination.prev_num) if pagination.has_prev else None,
                          filieres=filieres)
 
 @student_bp.route('/students/add', methods=['GET', 'POST'])
@@ -86,7 +112,7 @@ def list_students():
 def add_student():
     print('student_route.add_student appelé')
     filieres = FiliereController().list_filieres()
-    rooms = RoomController().list_rooms()
+    rooms = RoomController().list_room_metadata()
     if request.method == 'POST':
         data = request.form
         result = student_controller.add_student(data, request.files)
@@ -102,7 +128,7 @@ def student_profile(student_id):
     print('student_route.student_profile appelé')
     result = student_controller.get_student(student_id)
     filieres = FiliereController().list_filieres()
-    rooms = RoomController().list_rooms()
+    rooms = RoomController().list_room_metadata()
     if 'error' in result:
         flash(result['error'], 'danger')
         return redirect(url_for('student.list_students'))
@@ -131,7 +157,7 @@ def delete_student(student_id):
 def export_students_xlsx():
     print('student_route.export_students_xlsx appelé')
     try:
-        students = student_controller.list_students()
+        students = student_controller.iter_students(projection='export')
         return export_xlsx(students, filename='etudiants.xlsx')
     except Exception as e:
         flash(str(e), 'danger')
@@ -152,7 +178,7 @@ def import_students_xlsx():
     filiere_controller = FiliereController()
     room_controller = RoomController()
     filieres_by_id = {str(f['id']): f['id'] for f in filiere_controller.list_filieres()}
-    rooms_by_num = {str(r['room_number']): r['room_number'] for r in room_controller.list_rooms()}
+    rooms_by_num = {str(r['room_number']): r['room_number'] for r in room_controller.list_room_metadata()}
     imported_students = []
     failed_students = []
     for student in data:
@@ -169,15 +195,17 @@ def import_students_xlsx():
         # If date_naissance missing, set to default
         if not student.get('date_naissance'):
             student['date_naissance'] = '0001-01-01'
-        try:
-            result = student_controller.add_student(student)
-            if isinstance(result, dict) and result.get('error'):
-                failed_students.append(f"<b>{student.get('nom', '')} {student.get('prenom', '')} (Matricule: {student.get('matricule', 'inconnu')})</b> - erreur: {result['error']}")
-            else:
-                imported_students.append(f"<b>{student.get('nom', '')} {student.get('prenom', '')} (Matricule: {student.get('matricule', 'inconnu')})</b>")
-                imported_count += 1
-        except Exception as e:
-            failed_students.append(f"<b>{student.get('nom', '')} {student.get('prenom', '')} (Matricule: {student.get('matricule', 'inconnu')})</b> - erreur technique: {e}")
+    # Insert all rows in batches, then report per-row outcomes
+    try:
+        outcomes = student_controller.import_students(data)
+    except Exception as e:
+        outcomes = [{'index': i, 'success': False, 'error': f"erreur technique: {e}"} for i in range(len(data))]
+    for student, outcome in zip(data, outcomes):
+        if outcome['success']:
+            imported_students.append(f"<b>{student.get('nom', '')} {student.get('prenom', '')} (Matricule: {student.get('matricule', 'inconnu')})</b>")
+            imported_count += 1
+        else:
+            failed_students.append(f"<b>{student.get('nom', '')} {student.get('prenom', '')} (Matricule: {student.get('matricule', 'inconnu')})</b> - erreur: {outcome['error']}")
     msg = f"<b>{imported_count} étudiant(s) importé(s) avec succès !</b>"
     if imported_students:
         msg += '<br><u>Étudiants ajoutés :</u><ul>' + ''.join(f'<li>{s}</li>' for s in imported_students) + '</ul>'
@@ -218,7 +246,7 @@ def download_pdf(student_id):
 def export_students_pdf():
     print('student_route.export_students_pdf appelé')
     try:
-        students = student_controller.list_students()
+        students = student_controller.iter_students(projection='export')
         if isinstance(students, dict) and 'error' in students:
             flash(students['error'], 'danger')
             return redirect(url_for('student.list_students'))
@@ -287,7 +315,7 @@ def upload_student_image(student_id):
 def modify_student(student_id):
     print('student_route.modify_student appelé')
     filieres = FiliereController().list_filieres()
-    rooms = RoomController().list_rooms()
+    rooms = RoomController().list_room_metadata()
     if request.method == 'POST':
         data = request.form
         result = student_controller.update_student(student_id, data, request.files)
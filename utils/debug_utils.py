@@ -8,10 +8,13 @@ def reset_database_util():
     try:
         # Drop all main tables if they exist
         cursor.execute("DROP TABLE IF EXISTS room_history")
+        cursor.execute("DROP TABLE IF EXISTS student_details")
+        cursor.execute("DROP TABLE IF EXISTS student_search")
         cursor.execute("DROP TABLE IF EXISTS students")
         cursor.execute("DROP TABLE IF EXISTS rooms")
         cursor.execute("DROP TABLE IF EXISTS filieres")
         cursor.execute("DROP TABLE IF EXISTS users")
+        cursor.execute("DROP TABLE IF EXISTS schema_migrations")
         conn.commit()
     except Exception as e:
         conn.rollback()
@@ -22,6 +25,8 @@ def reset_database_util():
     # Recreate tables
     from models import ensure_database_and_tables
     ensure_database_and_tables()
+    from database.cache import invalidate_tables
+    invalidate_tables()
 
 def create_sample_data_util():
     from models import create_dummy_data
@@ -35,7 +40,8 @@ def cleanup_filieres_util():
     from models.filiere import Filiere
     filiere_model = Filiere()
     filiere_model.cursor.execute("DELETE FROM filieres WHERE name = 'name' OR id = 'id' OR created_at = 'created_at'")
-    filiere_model.conn.commit()
+    filiere_model.session.mark_dirty('filieres')
+    filiere_model.session.commit()
 
 def create_default_admin_user_util():
     """Create a default admin user if no users exist"""
@@ -66,3 +72,17 @@ def create_default_admin_user_util():
     except Exception as e:
         print(f"Error in create_default_admin_user_util: {str(e)}")
         return False
+
+def reconcile_rooms_util():
+    from models.room import Room
+    room_model = Room()
+    fixed = room_model.reconcile_occupancy()
+    room_model.session.commit()
+    return fixed
+
+def get_db_stats_util():
+    """Collect database monitoring counters"""
+    from database.cache import get_cache_stats
+    from database.db import get_breaker_stats, get_pool_stats, get_query_stats
+    return {'pool': get_pool_stats(), 'breaker': get_breaker_stats(), 'cache': get_cache_stats(),
+            'queries': get_query_stats()}